@@ -1,4 +1,11 @@
-from RestPlaywright.utils.latest_swagger_file import get_latest_swagger_file
+import time
+
+# Taken before the package imports below so main() can report how long CLI startup took.
+_IMPORT_STARTED = time.perf_counter()
+
+from RestPlaywright.utils.generation_manifest import GenerationManifest
+from RestPlaywright.utils.latest_swagger_file import get_latest_swagger_file, print_changes
+from RestPlaywright.utils.llm import get_model_info
 from RestPlaywright.utils.llm_processor import LLMProcessor, GlobalSetup
 from RestPlaywright.utils.playwright_config_updater import PlaywrightConfigUpdater
 from RestPlaywright.utils.playwright_setup import PlaywrightProjectManager
@@ -14,7 +21,7 @@ def main():
     """Main function to orchestrate the workflow."""
     start_time = datetime.now()
     print("⏳ Started at:", start_time.strftime("%Y-%m-%d %H:%M:%S"))
-    extracted_dir = None
+    print(f"⚡ Startup imports took {(time.perf_counter() - _IMPORT_STARTED) * 1000:.0f} ms")
     load_dotenv()
     language = os.getenv("TARGET_LANGUAGE")
     swagger_folder = os.getenv("SWAGGER_FILE_PATH")
@@ -23,33 +30,49 @@ def main():
     if not swagger_folder or not target_folder:
         print("❌ Please set SWAGGER_FILE_PATH and TARGET_FOLDER in .env")
         return
-    swagger_file, result = get_latest_swagger_file(swagger_folder)
-    validator = OpenAPISpecValidator(swagger_file)
+    manifest = GenerationManifest(target_folder)
+    # The spec is parsed once here and the same document is shared by every stage below. With a manifest the
+    # changes come from what was actually generated, so the previous Swagger file is not even loaded.
+    spec, result = get_latest_swagger_file(swagger_folder, compare=not manifest.entries)
+    validator = OpenAPISpecValidator(spec, target_folder)
     validator.run_validation()
     projectmanager = PlaywrightProjectManager(target_folder)
     new_setup = projectmanager.setup()
-    updater = PlaywrightConfigUpdater(swagger_file, target_folder)
+    extractor = PathMethodExtractor(spec)
+    file_names = extractor.test_file_names()
+    updater = PlaywrightConfigUpdater(spec, target_folder, file_names)
     updater.run()
-    extractor = PathMethodExtractor(swagger_file)
+    from_manifest = False
+    if new_setup:
+        manifest.clear()
+    elif manifest.entries:
+        # Diff against what was actually generated rather than against the previous Swagger file.
+        result = manifest.diff(spec, file_names, *get_model_info())
+        print_changes(result)
+        from_manifest = True
+    elif result is not None:
+        manifest.seed(spec, file_names, exclude=result["added"] + result["updated"])
+
+    # Operations are extracted lazily and handed to the LLM in memory (SAVE_EXTRACTED_SPECS=true also dumps them).
+    operations = None
     if result is None or new_setup:
-        extracted_dir = extractor.extract_paths_and_methods()
-    else:
-        if result["added"] is not None or result["updated"] is not None:
-            if new_setup:
-                extracted_dir = extractor.extract_paths_and_methods()
-            else:
-                extracted_dir = extractor.get_update_add_paths_and_methods(result["added"], result["updated"])
+        operations = extractor.iter_operations()
+    elif result["added"] or result["updated"]:
+        operations = extractor.iter_operations(result["added"] + result["updated"])
 
     # Step 2: Run LLM over extracted specs
-    if extracted_dir is not None:
-        llm = GlobalSetup(target_folder, swagger_file)
+    if operations is not None:
+        llm = GlobalSetup(target_folder, spec)
         llm.genarateglobalsetup()
-        llm = LLMProcessor(target_folder, extracted_dir, language)
-        llm.run()
-    if result is not None and result["deleted"] is not None:
-        extractor.remove_files(result["deleted"], target_folder)
+        llm = LLMProcessor(target_folder, None, language, manifest=manifest)
+        llm.run(operations)
+        if extractor.save_to_disk:
+            print(f"\n📁 Extracted specs saved in: {extractor.output_dir}")
+    if result is not None and result["deleted"]:
+        extractor.remove_files(result["deleted"], target_folder, manifest if from_manifest else None)
+    manifest.save()
 
-    readme = SwaggerToReadme(swagger_file, target_folder)
+    readme = SwaggerToReadme(spec, target_folder)
     readme.generate_readme()
     end_time = datetime.now()
     print("⏳ Started at:", end_time.strftime("%Y-%m-%d %H:%M:%S"))
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+from datetime import datetime
+from RestPlaywright.utils.spec_document import SpecDocument
+from RestPlaywright.utils.state import get_state_dir
+
+
+class GenerationManifest:
+    """
+    Record of what was actually generated in a target project.
+
+    ``<TARGET_FOLDER>/.restplaywright/manifest.json`` maps each generated test file (e.g.
+    "pet_petId_GET.spec.js") to the operation it covers, the input fingerprint it was generated from and the
+    model that generated it. A new spec is diffed against this record instead of against the previous
+    Swagger file, and obsolete tests are deleted by exact lookup.
+    """
+
+    FILE_NAME = "manifest.json"
+    VERSION = 1
+
+    def __init__(self, target_folder: str):
+        self.target_folder = target_folder
+        self.path = get_state_dir(target_folder) / self.FILE_NAME
+        self.tests_dir = os.path.join(target_folder, "tests")
+        self.entries = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk, starting empty if it is missing or unreadable."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get("files", {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable manifest {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Write the manifest atomically."""
+        with self._lock:
+            data = {"version": self.VERSION, "files": dict(sorted(self.entries.items()))}
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        print(f"🗂️ Manifest saved: {self.path} ({len(self.entries)} files)")
+
+    def clear(self):
+        """Forget every entry (e.g. after the tests folder was reset)."""
+        with self._lock:
+            self.entries = {}
+
+    def record(self, file_name: str, path: str, method: str, fingerprint: str, model: str = None,
+               provider: str = None):
+        """
+        Record a generated test file.
+        :param file_name: Name of the test file inside tests/.
+        :param path: The operation's path.
+        :param method: The operation's HTTP method.
+        :param fingerprint: The operation's input fingerprint.
+        :param model: The model that generated the file.
+        :param provider: The model provider.
+        :return: None
+        """
+        with self._lock:
+            self.entries[file_name] = {
+                "path": path,
+                "method": method,
+                "fingerprint": fingerprint,
+                "model": model,
+                "provider": provider,
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def remove(self, file_name: str):
+        """Drop a file from the manifest."""
+        with self._lock:
+            self.entries.pop(file_name, None)
+
+    def seed(self, spec: SpecDocument, file_names: dict, exclude=()):
+        """
+        Adopt test files generated before the manifest existed, assuming they match the current spec.
+        :param spec: The current spec.
+        :param file_names: (path, method) -> test file name for every operation.
+        :param exclude: Operations about to be regenerated, which are recorded once generated instead.
+        :return: Number of adopted files.
+        """
+        excluded = set(exclude)
+        adopted = 0
+        for op, fingerprint in spec.input_fingerprints.items():
+            file_name = file_names[op]
+            if op in excluded or file_name in self.entries:
+                continue
+            if os.path.isfile(os.path.join(self.tests_dir, file_name)):
+                self.record(file_name, op[0], op[1], fingerprint)
+                adopted += 1
+        if adopted:
+            print(f"🗂️ Adopted {adopted} existing test files into the manifest")
+        return adopted
+
+    def diff(self, spec: SpecDocument, file_names: dict, model: str = None, provider: str = None):
+        """
+        Compare a spec with what was generated.
+        A test generated by a different model or provider than the configured one counts as updated, so
+        switching LLM_MODEL / LLM_MODEL_PROVIDER regenerates the suite; tests adopted without a recorded model
+        are kept.
+        :param spec: The current spec.
+        :param file_names: (path, method) -> test file name for every operation.
+        :param model: The configured model name.
+        :param provider: The configured model provider.
+        :return: A dict with "added" and "updated" (path, method) tuples and "deleted" test file names.
+        """
+        by_operation = {(entry["path"], entry["method"]): (name, entry) for name, entry in self.entries.items()}
+        added, updated = [], []
+        model_changed = 0
+        for op, fingerprint in spec.input_fingerprints.items():
+            known = by_operation.get(op)
+            if known is None or not os.path.isfile(os.path.join(self.tests_dir, known[0])):
+                added.append(op)
+            elif known[1]["fingerprint"] != fingerprint:
+                updated.append(op)
+            elif self.generated_by_other_model(known[1], model, provider):
+                updated.append(op)
+                model_changed += 1
+
+        current = set(file_names.values())
+        deleted = sorted(name for name in self.entries if name not in current)
+
+        print(f"🗂️ Manifest diff: {len(added)} added, {len(updated)} updated, {len(deleted)} deleted")
+        if model_changed:
+            print(f"🗂️ {model_changed} of the updated tests were generated by another model or provider")
+        return {"added": added, "updated": updated, "deleted": deleted, "components": []}
+
+    @staticmethod
+    def generated_by_other_model(entry: dict, model: str = None, provider: str = None) -> bool:
+        """Whether a manifest entry records a model or provider other than the given (known) ones."""
+        if entry.get("model") is None and entry.get("provider") is None:
+            return False
+        return ((model is not None and entry.get("model") != model)
+                or (provider is not None and entry.get("provider") != provider))
@@ -1,23 +1,23 @@
 import os
 import glob
-import yaml
 import re
-from deepdiff import DeepDiff
 from datetime import datetime
+from RestPlaywright.utils.spec_document import SpecDocument
+from RestPlaywright.utils.spec_fingerprint import component_fingerprints, operation_fingerprints
+from RestPlaywright.utils.spec_refs import RefGraph
 
 
 def load_swagger(file_path):
     """
-       Loads a Swagger (OpenAPI) file from the given path and parses its YAML content.
+       Loads a Swagger (OpenAPI) file from the given path.
 
        Args:
            file_path (str): Path to the Swagger file.
 
        Returns:
-           dict: Parsed Swagger file as a Python dictionary.
+           SpecDocument: The parsed Swagger document, shared by the rest of the pipeline.
        """
-    with open(file_path, 'r') as f:
-        return yaml.safe_load(f)
+    return SpecDocument.load(file_path)
 
 
 def get_two_latest_files(folder, prefix='Swagger'):
@@ -51,82 +51,99 @@ def get_two_latest_files(folder, prefix='Swagger'):
     print(f"Found {len(files_sorted)} files.")
     return files_sorted[-2], files_sorted[-1]
 
-def compare_swagger_paths(old_swagger, new_swagger):
+def operation_file_stem(path, method):
+    """Name under which deleted operations are reported, e.g. 'pet_findByStatus_GET'."""
+    return f"{path.strip('/').replace('/', '_')}_{method.upper()}"
+
+
+def compare_swagger_paths(old_swagger, new_swagger, new_ref_graph=None):
     """
-        Compares the 'paths' sections of two Swagger files to identify added, deleted, and updated API paths and methods.
+        Compares the operations of two Swagger files to identify added, deleted, and updated API operations.
+        Each operation is fingerprinted with a canonical-JSON hash, so the comparison is linear in the size of
+        the specs and only the methods that actually changed are reported. Components are fingerprinted too,
+        and a changed component marks exactly the operations that reach it (directly or through other
+        components) as updated.
 
         Args:
             old_swagger (dict): The older Swagger file as a dictionary.
             new_swagger (dict): The newer Swagger file as a dictionary.
+            new_ref_graph (RefGraph, optional): Reference graph of the new spec, if already built.
         Returns:
-            tuple: A tuple containing three lists:
-                - added (list): List of newly added paths.
-                - deleted (list): List of deleted paths and methods in the format 'path_method'.
-                - updated (list): List of paths that have been updated.
+            dict: A dictionary with four lists:
+                - added (list): Newly added operations as (path, method) tuples.
+                - deleted (list): Deleted operations in the format 'path_METHOD'.
+                - updated (list): Changed operations as (path, method) tuples.
+                - components (list): Component references that changed.
         """
-    old_paths = old_swagger.get("paths", {})
-    new_paths = new_swagger.get("paths", {})
-
-    old_set = set(old_paths.keys())
-    new_set = set(new_paths.keys())
-
-    added = new_set - old_set
-    deleted_paths = old_set - new_set
-    common = old_set & new_set
-
-    updated = []
-    deleted = []
-
-    for path in common:
-        old_details = old_paths[path]
-        new_details = new_paths[path]
-        diff = DeepDiff(old_details, new_details, ignore_order=True)
-        if diff:
-            updated.append(path)
-        old_methods = old_paths[path]
-        new_methods = new_paths[path]
-
-        # Detect deleted methods
-        deleted_methods = set(old_methods.keys()) - set(new_methods.keys())
-        for method in deleted_methods:
-            deleted.append(f"{path.strip('/').replace('/', '_')}_{method.upper()}")
-        # Full path deletions
-
-    for path in deleted_paths:
-        for method in old_paths[path].keys():
-            deleted.append(f"{path.strip('/').replace('/', '_')}_{method.upper()}")
+    old_operations = operation_fingerprints(old_swagger)
+    new_operations = operation_fingerprints(new_swagger)
+
+    added = [op for op in new_operations if op not in old_operations]
+    updated = [op for op, fp in new_operations.items() if op in old_operations and old_operations[op] != fp]
+    deleted = [operation_file_stem(path, method) for path, method in old_operations if (path, method) not in new_operations]
+
+    old_components = component_fingerprints(old_swagger)
+    new_components = component_fingerprints(new_swagger)
+    changed_components = sorted(
+        ref for ref in old_components.keys() | new_components.keys()
+        if old_components.get(ref) != new_components.get(ref)
+    )
+    if changed_components:
+        ref_graph = new_ref_graph or RefGraph(new_swagger)
+        seen = set(added) | set(updated)
+        for op in sorted(ref_graph.dependent_operations(changed_components)):
+            if op not in seen:
+                updated.append(op)
+                seen.add(op)
 
     return {
-        "added": list(added),
+        "added": added,
         "deleted": deleted,
-        "updated": updated
+        "updated": updated,
+        "components": changed_components
     }
 
 
-def get_latest_swagger_file(folder):
+def print_changes(result):
+    """
+    Print the added, deleted and updated operations (and changed components) of a comparison.
+    :param result: A dictionary with added, deleted, updated and components lists.
+    :return: None
+    """
+    print("=== Added Operations ===")
+    for path, method in result["added"]:
+        print(f"{method.upper()} {path}")
+
+    print("\n=== Deleted Operations ===")
+    for name in result["deleted"]:
+        print(name)
+
+    print("\n=== Changed Components ===")
+    for ref in result["components"]:
+        print(ref)
+
+    print("\n=== Updated Operations ===")
+    for path, method in result["updated"]:
+        print(f"{method.upper()} {path}")
+
+
+def get_latest_swagger_file(folder, compare=True):
     """
     Compares the two latest Swagger files in the specified folder and identifies added, deleted, and updated API paths.
     :param folder: Directory containing Swagger files.
-    :return: Tuple containing the latest Swagger file path and a dictionary with added, deleted, and updated paths.
+    :param compare: When False only the latest file is loaded, e.g. because the changes are taken from the
+        generation manifest instead.
+    :return: Tuple containing the latest Swagger document (parsed once) and a dictionary with added, deleted,
+        and updated operations (None when there is nothing to compare with, or compare is False).
     """
     old_file, new_file = get_two_latest_files(folder)
-    if new_file is None: return old_file, None
+    if new_file is None: return load_swagger(old_file), None
+    if not compare: return load_swagger(new_file), None
     print(f"Comparing:\nOld: {old_file}\nNew: {new_file}\n")
 
     old_swagger = load_swagger(old_file)
     new_swagger = load_swagger(new_file)
 
-    result = compare_swagger_paths(old_swagger, new_swagger)
-
-    print("=== Added Paths ===")
-    for path in result["added"]:
-        print(path)
-
-    print("\n=== Deleted Paths ===")
-    for path in result["deleted"]:
-        print(path)
-
-    print("\n=== Updated Paths ===")
-    for path in result["updated"]:
-        print(path)
-    return new_file, result
+    result = compare_swagger_paths(old_swagger.data, new_swagger.data, new_swagger.ref_graph)
+    print_changes(result)
+    return new_swagger, result
@@ -1,8 +1,22 @@
 import os
+import threading
 from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+# The chat model client is created on first use, so stages that never call the LLM (validation, README
+# generation, ...) neither pay for importing langchain and the provider SDKs nor need API credentials.
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_model_info():
+    """
+    Returns the configured model name and provider.
+
+    Returns:
+        tuple: (LLM_MODEL, LLM_MODEL_PROVIDER)
+    """
+    load_dotenv()
+    return os.getenv("LLM_MODEL"), os.getenv("LLM_MODEL_PROVIDER")
 
 
 def get_llm():
@@ -12,25 +26,66 @@ def get_llm():
        Returns:
            An instance of a chat model client (ChatGoogleGenerativeAI, ChatOpenAI, or other supported by langchain).
        """
-    load_dotenv()
-    model = os.getenv("LLM_MODEL")
-    model_provider = os.getenv("LLM_MODEL_PROVIDER")
+    model, model_provider = get_model_info()
     print(f"LLM_MODEL={model} and LLM_MODEL_PROVIDER={model_provider}")
 
     if model_provider == "google_genai":
+        # Gemini 2.5+ caches repeated prompt prefixes implicitly; cached tokens show up in usage_metadata.
+        from langchain_google_genai import ChatGoogleGenerativeAI
         return ChatGoogleGenerativeAI(
             model=model,
             google_api_key=os.getenv("GEMINI_API_KEY")
         )
     if model_provider == "openai":
+        # OpenAI caches prompt prefixes automatically; a stable prompt_cache_key routes our calls to the same
+        # cache, and stream_usage reports usage (including cached tokens) for streamed replies too.
+        from langchain_openai import ChatOpenAI
         return ChatOpenAI(
             model_name=model,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            model_kwargs={"prompt_cache_key": os.getenv("LLM_PROMPT_CACHE_KEY", "restplaywright")},
+            stream_usage=True
         )
+    from langchain.chat_models import init_chat_model
     return init_chat_model(model=model, model_provider=model_provider)
 
 
-llm = get_llm()
+def supports_cache_control(model_provider: str = None) -> bool:
+    """
+      Whether the provider needs explicit cache breakpoints (Anthropic-style cache_control blocks) to cache
+      the static prompt prefix. Other supported providers cache prefixes automatically.
+
+      Args:
+          model_provider (str, optional): Provider name; defaults to LLM_MODEL_PROVIDER.
+
+      Returns:
+          bool: True when messages should carry cache_control markers.
+      """
+    if model_provider is None:
+        model_provider = get_model_info()[1]
+    return model_provider in ("anthropic", "bedrock_converse")
+
+
+def get_client():
+    """
+      Returns the shared LLM client, creating it on first use.
+
+      Returns:
+          The chat model client returned by get_llm().
+      """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = get_llm()
+    return _llm
+
+
+def __getattr__(name):
+    # Keeps `llm.llm` working for callers that used the former import-time client.
+    if name == "llm":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def invoke(prompt: str) -> str:
@@ -43,4 +98,17 @@ def invoke(prompt: str) -> str:
       Returns:
           str: The LLM's response to the prompt.
       """
-    return llm.invoke(prompt)
+    return get_client().invoke(prompt)
+
+
+def stream(prompt):
+    """
+      Streams the LLM's response to a prompt chunk by chunk.
+
+      Args:
+          prompt: The input prompt or list of messages to send to the LLM.
+
+      Returns:
+          Iterator of message chunks.
+      """
+    return get_client().stream(prompt)
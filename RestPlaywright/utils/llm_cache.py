@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from RestPlaywright.utils.state import get_state_dir, get_user_cache_dir
+
+
+class LLMResponseCache:
+    """
+    Content-addressed on-disk cache of LLM generations.
+
+    Each entry is stored as ``<cache_dir>/<key[:2]>/<key>.json`` where the key is a hash of everything that
+    determines the reply: model, provider, prompt text, target language and the operation's mini-spec.
+    """
+
+    def __init__(self, cache_dir, enabled: bool = True, max_age_days: float = None, max_size_mb: float = None):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+        self.hits = 0
+        self.misses = 0
+        # Generations run in a thread pool; the counters are updated under this lock.
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, target_folder: str):
+        """
+        Build the cache from environment variables.
+
+        LLM_CACHE=false bypasses the cache, LLM_CACHE_CLEAR=true empties it first, LLM_CACHE_DIR overrides
+        the location (``user`` selects the per-user cache dir) and LLM_CACHE_MAX_AGE_DAYS /
+        LLM_CACHE_MAX_SIZE_MB bound what is kept.
+        :param target_folder: The generated Playwright project folder.
+        :return: An LLMResponseCache instance.
+        """
+        cache_dir = os.getenv("LLM_CACHE_DIR")
+        if not cache_dir:
+            cache_dir = get_state_dir(target_folder) / "cache"
+        elif cache_dir == "user":
+            cache_dir = get_user_cache_dir() / "llm"
+
+        cache = cls(
+            cache_dir,
+            enabled=os.getenv("LLM_CACHE", "true").lower() == "true",
+            max_age_days=float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30")),
+            max_size_mb=float(os.getenv("LLM_CACHE_MAX_SIZE_MB", "512")),
+        )
+        if os.getenv("LLM_CACHE_CLEAR", "false").lower() == "true":
+            cache.clear()
+        if cache.enabled:
+            cache.evict()
+        return cache
+
+    @staticmethod
+    def make_key(model: str, provider: str, prompt: str, language: str, spec) -> str:
+        """
+        Compute the cache key for one generation.
+        :param model: The LLM model name.
+        :param provider: The LLM model provider.
+        :param prompt: The static prompt text (system prompt and any few-shot examples).
+        :param language: The target language.
+        :param spec: The operation's mini-spec (dict) or its prompt text.
+        :return: A hex sha256 digest.
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "provider": provider,
+                "prompt": prompt,
+                "language": language,
+                "spec": spec,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        """
+        Look up a cached reply.
+        :param key: The cache key.
+        :return: The cached reply text, or None on a miss or when the cache is disabled.
+        """
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                reply = json.load(f)["reply"]
+            if not isinstance(reply, str):
+                raise TypeError(f"reply is {type(reply).__name__}, not str")
+        except OSError:
+            self._count_miss()
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            # A corrupt or foreign entry: treat it as a miss and drop it so it is regenerated.
+            print(f"⚠️ Dropping unreadable LLM cache entry {path.name}: {e!r}")
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            self._count_miss()
+            return None
+        # Touch the entry so size-based eviction drops the least recently used files first.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return reply
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, key: str, reply: str, **metadata):
+        """
+        Store a reply in the cache.
+        :param key: The cache key.
+        :param reply: The reply text.
+        :param metadata: Extra fields saved alongside the reply (model, file name, ...).
+        :return: None
+        """
+        if not self.enabled:
+            return
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per process and thread: concurrent generations may write the same key at once.
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"reply": reply, "created": time.time(), **metadata}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def clear(self):
+        """Delete every cached entry."""
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir)
+            print(f"🗑️ Cleared LLM cache: {self.cache_dir}")
+
+    def evict(self):
+        """
+        Drop entries older than max_age_days, then the least recently used entries until the cache fits
+        in max_size_mb.
+        :return: Number of entries removed.
+        """
+        if not self.cache_dir.exists():
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            stat = path.stat()
+            if self.max_age_days and now - stat.st_mtime > self.max_age_days * 86400:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        if self.max_size_mb:
+            limit = self.max_size_mb * 1024 * 1024
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= limit:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            print(f"🧹 Evicted {removed} LLM cache entries from {self.cache_dir}")
+        return removed
@@ -1,33 +1,69 @@
+import hashlib
 import json
 import os
+import re
+import threading
+import time
 import yaml
-import jsonref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 from RestPlaywright.utils import llm
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from RestPlaywright.utils.llm_cache import LLMResponseCache
+from RestPlaywright.utils.operation_batcher import OperationBatcher
+from RestPlaywright.utils.operation_splitter import ContextWindowGuard, estimate_tokens, merge_spec_files
+from RestPlaywright.utils.rate_limiter import RateLimiter
+from RestPlaywright.utils.spec_document import SpecDocument
+from RestPlaywright.utils.spec_encoding import build_operation_prompt, encode_spec, get_spec_encoding
+from RestPlaywright.utils.spec_loader import load_spec_file
+from RestPlaywright.utils.spec_resolver import SpecResolver
+from RestPlaywright.utils.swagger_extractor import ExtractedOperation
+from RestPlaywright.utils.syntax_checker import SyntaxChecker
+
+def to_langchain_messages(messages, cache_breakpoint: int = None):
+    """
+    Convert OpenAI-style messages into LangChain messages.
+    :param messages: The OpenAI-style messages.
+    :param cache_breakpoint: Index of the last message of the static prompt prefix; when set, that message is
+        marked with an ephemeral cache_control block so providers with explicit prompt caching cache the prefix.
+    :return: A list of LangChain messages.
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 
-def to_langchain_messages(messages):
-    """Convert OpenAI-style messages into LangChain messages"""
     converted = []
-    for m in messages:
+    for index, m in enumerate(messages):
+        content = m["content"]
+        if index == cache_breakpoint:
+            content = [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
         if m["role"] == "system":
-            converted.append(SystemMessage(content=m["content"]))
+            converted.append(SystemMessage(content=content))
         elif m["role"] == "user":
-            converted.append(HumanMessage(content=m["content"]))
+            converted.append(HumanMessage(content=content))
         elif m["role"] == "assistant":
-            converted.append(AIMessage(content=m["content"]))
+            converted.append(AIMessage(content=content))
     return converted
-    
+
+
+
+class BatchError(Exception):
+    """Raised when some operations of a batch could not be generated; holds the error per file name."""
+
+    def __init__(self, errors: dict):
+        super().__init__(f"{len(errors)} operations of the batch failed")
+        self.errors = errors
 
 
 class LLMProcessor:
-    def __init__(self, target_folder: str, input_dir: str, language: str, output_dir: str = None):
+    def __init__(self, target_folder: str, input_dir: str, language: str, output_dir: str = None,
+                 concurrency: int = None, stateless: bool = None, cache: LLMResponseCache = None,
+                 operations: dict = None, manifest=None):
         self.playwright_dir = Path(target_folder)
-        self.input_dir = Path(input_dir)
+        # Only used when run() is not given the operations directly.
+        self.input_dir = Path(input_dir) if input_dir else None
         print(self.playwright_dir)
         self.output_dir = Path(output_dir) if output_dir else self.playwright_dir / "tests"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.llm = llm
+        self.language = language
         BASE_DIR = Path(__file__).resolve().parent
         # go up one level and then into prompts/
         PROMPT_PATH = BASE_DIR.parent / "prompts" / "prompt_codegen.txt"
@@ -38,35 +74,116 @@ class LLMProcessor:
                 "content": (self.prompt_data)
             }
         ]
-
-    def to_plain_obj(self, obj):
+        # Number of operations generated in parallel; concurrent calls are always stateless.
+        self.concurrency = max(1, concurrency or int(os.getenv("LLM_CONCURRENCY", "1")))
+        # Stateless: every call carries only the system prompt, the few-shot examples and one operation.
+        if stateless is None:
+            stateless = os.getenv("LLM_STATELESS", "true").lower() == "true"
+        self.stateless = stateless or self.concurrency > 1
+        self.few_shot_messages = self.load_few_shot_examples(os.getenv("LLM_FEW_SHOT_FILE"))
+        self.cache = cache if cache is not None else LLMResponseCache.from_env(target_folder)
+        self.model, self.model_provider = llm.get_model_info()
+        # Operations whose prompt or expected output is over budget are split per content-type combination.
+        self.guard = ContextWindowGuard.from_env()
+        self.split_concurrency = max(1, int(os.getenv("LLM_SPLIT_CONCURRENCY", "4")))
+        # Small operations can be packed into one multi-file request (stateless mode only).
+        self.batcher = OperationBatcher.from_env()
+        self.system_prompt_tokens = estimate_tokens(self.prompt_data)
+        # How the operation spec is serialised into the prompt (LLM_SPEC_ENCODING).
+        self.spec_encoding = get_spec_encoding()
+        # The system prompt and few-shot examples form a byte-identical prefix of every stateless call, so
+        # providers can serve it from their prompt cache; some need an explicit cache breakpoint for that.
+        self.cache_control = llm.supports_cache_control(self.model_provider)
+        # Stream replies straight into a temp file that is atomically renamed into tests/ when complete.
+        self.stream = os.getenv("LLM_STREAM", "false").lower() == "true"
+        # Throttles every LLM call: RPM/TPM buckets, retries and an adaptive limit on calls in flight.
+        self.rate_limiter = RateLimiter.from_env(self.model, max(self.concurrency, self.split_concurrency))
+        # Parses the files written in a run; broken ones are regenerated with the parser error.
+        self.syntax_checker = SyntaxChecker.from_env()
+        # Spec file stem -> operation metadata, used to record tests generated from spec files on disk in the
+        # manifest; in-memory ExtractedOperation objects carry their own. Kept by reference, as the caller may
+        # still be filling it.
+        self.operations = operations if operations is not None else {}
+        self.manifest = manifest
+        self.failures = {}
+        self.token_usage = {}
+        self.written_files = []
+        # Written test file -> the spec file or ExtractedOperation it was generated from.
+        self.sources = {}
+        # Written test file -> (cache key, files) of the batch reply it came from.
+        self.batches = {}
+        self._lock = threading.Lock()
+
+    def load_few_shot_examples(self, few_shot_file: str = None):
         """
-        Recursively convert jsonref objects to plain dicts/lists.
-        :param obj:  The object to convert.
-        :return: A plain dict or list.
+        Load the optional fixed few-shot examples sent ahead of every operation in stateless mode.
+        The file (JSON or YAML) holds a list of {"user": ..., "assistant": ...} pairs.
+        :param few_shot_file: Path of the examples file, or None.
+        :return: A list of OpenAI-style messages.
         """
-        if isinstance(obj, dict):
-            return {k: self.to_plain_obj(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self.to_plain_obj(i) for i in obj]
-        return obj
-
-    def load_spec(self, file: Path):
+        if not few_shot_file:
+            return []
+        with open(few_shot_file, "r", encoding="utf-8") as f:
+            examples = yaml.safe_load(f) or []
+
+        messages = []
+        for example in examples:
+            messages.append({"role": "user", "content": example["user"]})
+            messages.append({"role": "assistant", "content": example["assistant"]})
+        print(f"📚 Loaded {len(examples)} few-shot examples from {few_shot_file}")
+        return messages
+
+    def record_usage(self, name: str, response):
         """
-        Load and resolve references in the OpenAPI spec file.
-        :param file: The OpenAPI spec file path.
-        :return: A dict with resolved references.
+        Record the token usage reported by the LLM for one call.
+        :param name: The spec file name the call was made for.
+        :param response: The LangChain message returned by the LLM.
+        :return: The usage dict for this call (empty when the provider reports none).
         """
-        with open(file, "r", encoding="utf-8") as f:
-            if file.suffix in [".yaml", ".yml", ".json"]:
-                raw = yaml.safe_load(f)
-            else:
-                raw = json.load(f)
+        metadata = getattr(response, "usage_metadata", None) or {}
+        usage = {key: metadata.get(key, 0) for key in ("input_tokens", "output_tokens", "total_tokens")}
+        details = metadata.get("input_token_details") or {}
+        usage["cache_read_tokens"] = details.get("cache_read") or 0
+        usage["cache_creation_tokens"] = details.get("cache_creation") or 0
+        with self._lock:
+            self.token_usage[name] = usage
+        return usage
+
+    def usage_totals(self):
+        """
+        Sum the token usage of all calls made so far.
+        :return: A dict with input_tokens, output_tokens, total_tokens and the prompt cache read/creation tokens.
+        """
+        totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0,
+                  "cache_read_tokens": 0, "cache_creation_tokens": 0}
+        for usage in self.token_usage.values():
+            for key in totals:
+                totals[key] += usage.get(key, 0)
+        return totals
+
+    def read_spec(self, file: Path):
+        """
+        Load the OpenAPI spec file without resolving references.
+        :param file: The OpenAPI spec file path, or an in-memory ExtractedOperation.
+        :return: The spec as a dict.
+        """
+        if isinstance(file, ExtractedOperation):
+            return file.spec
+        raw = load_spec_file(file)
 
         if raw is None:
             raise ValueError(f"File {file.name} is empty or invalid.")
-        resolved = jsonref.replace_refs(raw, merge_props=True)
-        return self.to_plain_obj(resolved)
+        return raw
+
+    def load_spec(self, file: Path):
+        """
+        Load and resolve references in the OpenAPI spec file.
+        :param file: The OpenAPI spec file path, or an in-memory ExtractedOperation.
+        :return: A dict with resolved references; resolved components are shared and must not be modified.
+        """
+        raw = self.read_spec(file)
+        resolver = getattr(file, "resolver", None) or SpecResolver.from_env(raw)
+        return resolver.resolve(raw)
 
     def build_prompt(self, spec: dict, filename: str) -> str:
         """
@@ -75,59 +192,476 @@ class LLMProcessor:
         :param filename: The name of the OpenAPI spec file.
         :return: A formatted prompt string.
         """
-        # Only pass filename + spec as input
-        return f"""
-            OpenAPI file: **{filename}**
+        return build_operation_prompt(spec, filename, self.spec_encoding)
 
-            Spec:
-            {json.dumps(spec, indent=2)}
-
-            Generate the Playwright .spec.js file.
-            """
-
-    def run(self):
+    def spec_files(self):
         """
-        Process each OpenAPI spec file in the input directory, generate Playwright test code using the LLM,
-        and save the output to the output directory.
-        :return: None
+        List the OpenAPI spec files in the input directory.
+        :return: A sorted list of spec file paths.
         """
-        for file in self.input_dir.iterdir():
-            if file.suffix.lower() not in [".json", ".yaml", ".yml"]:
-                continue
-            try:
-                print(f"📄 Processing {file.name}")
-                spec = self.load_spec(file)
-                # prompt = self.build_prompt(spec, file.name)
-                # Instead of building a long prompt, just attach spec + filename
-                user_message = self.build_prompt(spec, file.name)
-                self.messages.append({"role": "user", "content": user_message})
+        return sorted(
+            file for file in self.input_dir.iterdir()
+            if file.suffix.lower() in [".json", ".yaml", ".yml"]
+        )
 
-                # Convert to LangChain messages
-                lc_messages = to_langchain_messages(self.messages)
-
-                # Call your LangChain LLM
-                response = llm.invoke(lc_messages)
+    def cache_key(self, user_prompt: str) -> str:
+        """
+        Compute the response cache key for one generation.
+        :param user_prompt: The user prompt, which embeds the operation's resolved mini-spec.
+        :return: The cache key.
+        """
+        prompt = json.dumps([self.prompt_data, self.few_shot_messages], ensure_ascii=False)
+        return LLMResponseCache.make_key(self.model, self.model_provider, prompt, self.language, user_prompt)
 
-                # Extract the content
-                reply = response.content.strip()
+    def generate_reply(self, name: str, user_prompt: str, isolated: bool, stream_to: Path = None):
+        """
+        Get the LLM reply for one user prompt, from the response cache when possible.
+        :param name: Label used for logging and token accounting.
+        :param user_prompt: The user message content.
+        :param isolated: Send only the system prompt, few-shot examples and this prompt instead of the
+            shared conversation.
+        :param stream_to: Stream the reply, without code fences, into this file (always written, also on a
+            cache hit) instead of waiting for the whole response.
+        :return: A (reply, usage) tuple.
+        """
+        user_message = {"role": "user", "content": user_prompt}
+        if isolated:
+            messages = [self.messages[0], *self.few_shot_messages, user_message]
+        else:
+            self.messages.append(user_message)
+            messages = self.messages
+        # Everything before the new user message is a prefix earlier calls already sent.
+        cache_breakpoint = len(messages) - 2 if self.cache_control else None
+
+        key = self.cache_key(user_prompt)
+        reply = self.cache.get(key)
+        if reply is not None:
+            print(f"♻️ Cache hit for {name}")
+            usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0,
+                     "cache_read_tokens": 0, "cache_creation_tokens": 0}
+            if stream_to is not None:
+                atomic_write_text(stream_to, strip_code_fences(reply))
+        elif stream_to is not None:
+            lc_messages = to_langchain_messages(messages, cache_breakpoint)
+            estimated_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+            response = self.rate_limiter.call(lambda: self.stream_to_file(name, lc_messages, stream_to),
+                                              estimated_tokens, name)
+            reply = stream_to.read_text(encoding="utf-8")
+            usage = self.record_usage(name, response)
+            self.cache.put(key, reply, file=name, model=self.model)
+        else:
+            # Convert to LangChain messages and call your LangChain LLM
+            lc_messages = to_langchain_messages(messages, cache_breakpoint)
+            estimated_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+            response = self.rate_limiter.call(lambda: llm.invoke(lc_messages), estimated_tokens, name)
+
+            # Extract the content
+            reply = response.content.strip()
+            usage = self.record_usage(name, response)
+            self.cache.put(key, reply, file=name, model=self.model)
+
+        if not isolated:
+            # Save assistant reply back to conversation
+            self.messages.append({"role": "assistant", "content": reply})
+        return reply, usage
+
+    def stream_to_file(self, name: str, lc_messages, output_file: Path):
+        """
+        Stream one generation into a temp file next to ``output_file``, stripping code fences on the fly, and
+        atomically rename it into place once the stream is complete. A failed or interrupted stream never
+        leaves a truncated test file behind.
+        :param name: Label used for progress output.
+        :param lc_messages: The LangChain messages to send.
+        :param output_file: Final path of the test file.
+        :return: An object whose usage_metadata holds the usage summed over all chunks.
+        """
+        tmp_path = temp_path_for(output_file)
+        stripper = StreamingFenceStripper()
+        usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0, "input_token_details": {}}
+        written = 0
+        last_report = time.monotonic()
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for chunk in llm.stream(lc_messages):
+                    text = chunk_text(chunk)
+                    if text:
+                        f.write(stripper.feed(text))
+                        written += len(text)
+                    for key, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+                        if key in usage and isinstance(value, int):
+                            usage[key] += value
+                        elif key == "input_token_details":
+                            for detail, count in value.items():
+                                usage[key][detail] = usage[key].get(detail, 0) + (count or 0)
+                    if time.monotonic() - last_report >= 5:
+                        print(f"✍️ {name}: {written / 1024:.1f} KB received")
+                        last_report = time.monotonic()
+                f.write(stripper.finish())
+            os.replace(tmp_path, output_file)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return StreamResult(usage)
+
+    def generate_split(self, file: Path, pieces, repair: str = None):
+        """
+        Generate an oversized operation as several smaller calls, one per content-type combination, run in
+        parallel and merged into one test file with a single set of imports.
+        :param file: The OpenAPI spec file path.
+        :param pieces: (label, sub_spec) tuples from ContextWindowGuard.split().
+        :param repair: Parser error of the previously merged file, to regenerate every piece with.
+        :return: A (reply, usage) tuple for the merged file.
+        """
+        print(f"✂️ Splitting {file.name} into {len(pieces)} content-type generations")
+
+        def generate_piece(label, sub_spec):
+            prompt = self.build_prompt(sub_spec, file.name) + (
+                f"\nGenerate only the tests for the {label} content-type combination; they will be merged "
+                f"with the other combinations into {file.stem}.spec.js.\n"
+            )
+            if repair is None:
+                reply, usage = self.generate_reply(f"{file.name} [{label}]", prompt, isolated=True)
+                return strip_code_fences(reply), usage
+            # The merged file is too big to send back; every piece gets the parser error instead.
+            reply, usage = self.generate_reply(f"{file.name} [{label}] [syntax fix]",
+                                               prompt + self.repair_note(f"{file.stem}.spec.js", repair),
+                                               isolated=True)
+            code = strip_code_fences(reply)
+            self.cache.put(self.cache_key(prompt), code, file=file.name, model=self.model)
+            return code, usage
+
+        with ThreadPoolExecutor(max_workers=min(len(pieces), self.split_concurrency)) as executor:
+            results = list(executor.map(lambda piece: generate_piece(*piece), pieces))
+
+        merged = merge_spec_files([(label, code) for (label, _), (code, _) in zip(pieces, results)])
+        usage = {key: sum(u.get(key, 0) for _, u in results) for key in ("input_tokens", "output_tokens")}
+        return merged, usage
+
+    def process_file(self, file: Path, isolated: bool = None, repair: str = None):
+        """
+        Generate the Playwright test for a single OpenAPI spec file and write it to the output directory.
+        :param file: The OpenAPI spec file path.
+        :param isolated: Send only the system prompt, few-shot examples and this operation instead of the
+            shared conversation. Defaults to the processor's stateless setting.
+        :param repair: Parser error of the existing test file, to regenerate it with the broken code and the
+            error; the call goes through the same context window guard as the first generation.
+        :return: The path of the written test file.
+        """
+        if isolated is None:
+            isolated = self.stateless
+        print(f"📄 Processing {file.name}")
+        spec = self.load_spec(file)
+        # Instead of building a long prompt, just attach spec + filename
+        user_prompt = self.build_prompt(spec, file.name)
+        prompt = user_prompt
+        if repair is not None:
+            output_name = f"{file.stem}.spec.js"
+            prompt += self.repair_note(output_name, repair, (self.output_dir / output_name).read_text(encoding="utf-8"))
+
+        prompt_tokens = self.system_prompt_tokens + estimate_tokens(prompt)
+        pieces = self.guard.split(spec) if self.guard.is_over_budget(spec, prompt_tokens) else [(None, spec)]
+        if len(pieces) > 1:
+            reply, usage = self.generate_split(file, pieces, repair)
+        elif repair is not None:
+            reply, usage = self.generate_reply(f"{file.name} [syntax fix]", prompt, isolated=True)
+            # Replace the broken reply cached for the operation, so a rerun does not bring it back.
+            self.cache.put(self.cache_key(user_prompt), strip_code_fences(reply), file=file.name, model=self.model)
+        elif self.stream:
+            stream_to = self.output_dir / f"{file.stem}.spec.js"
+            reply, usage = self.generate_reply(file.name, user_prompt, isolated, stream_to=stream_to)
+            reply = None  # Already written by the stream.
+        else:
+            reply, usage = self.generate_reply(file.name, user_prompt, isolated)
+
+        output_file = self.write_output(file, reply)
+        print(f"✅ Saved LLM response for {file.name} "
+              f"(tokens in: {usage['input_tokens']}, out: {usage['output_tokens']})")
+        return output_file
+
+    def write_output(self, file: Path, reply: str = None, batch=None):
+        """
+        Atomically write the generated test for a spec file and record it.
+        :param file: The OpenAPI spec file path the test was generated from.
+        :param reply: The generated code, or None when it was already streamed into place.
+        :param batch: A (cache key, files) tuple when the test came out of a batch reply.
+        :return: The path of the written test file.
+        """
+        output_file = self.output_dir / f"{file.stem}.spec.js"
+        if reply is not None:
+            atomic_write_text(output_file, strip_code_fences(reply))
+        broken_file(output_file).unlink(missing_ok=True)
+        with self._lock:
+            if output_file not in self.sources:
+                self.written_files.append(output_file)
+            self.sources[output_file] = file
+            if batch is not None:
+                self.batches[output_file] = batch
+        operation = self.operations.get(file.stem)
+        if operation is None and isinstance(file, ExtractedOperation):
+            operation = {"path": file.path, "method": file.method, "fingerprint": file.fingerprint}
+        if self.manifest is not None and operation:
+            self.manifest.record(output_file.name, operation["path"], operation["method"],
+                                 operation["fingerprint"], self.model, self.model_provider)
+        return output_file
+
+    def process_batch(self, files, repairs: dict = None):
+        """
+        Generate several small operations with one LLM request and split the multi-file reply back into
+        individual test files. Operations missing from the reply, or the whole batch on error, fall back to
+        one call per operation.
+        :param files: The OpenAPI spec file paths of the batch.
+        :param repairs: Spec file name -> parser error, to regenerate broken tests of an earlier batch with
+            their code and error.
+        :return: The paths of the written test files.
+        """
+        names = [f"{file.stem}.spec.js" for file in files]
+        repairs = repairs or {}
+        print(f"📦 Processing batch of {len(files)}: {', '.join(file.name for file in files)}")
+        batch = None
+        try:
+            batch_spec = self.batcher.build_batch_spec([self.read_spec(file) for file in files])
+            prompt = self.build_prompt(batch_spec, ", ".join(file.name for file in files))
+            prompt += self.batcher.instructions(names)
+            label = f"batch[{files[0].name}..{files[-1].name}]"
+            if repairs:
+                for file, name in zip(files, names):
+                    prompt += self.repair_note(name, repairs[file.name],
+                                               (self.output_dir / name).read_text(encoding="utf-8"))
+                label += " [syntax fix]"
+            else:
+                batch = (self.cache_key(prompt), list(files))
+            reply, usage = self.generate_reply(label, prompt, isolated=True)
+            parts = self.batcher.split_reply(reply)
+        except Exception as e:
+            print(f"⚠️ Batch failed, generating its {len(files)} operations one by one: {e}")
+            parts, usage = {}, None
+
+        written, missing = [], []
+        for file, name in zip(files, names):
+            if name in parts:
+                written.append(self.write_output(file, parts[name], batch=batch))
+            else:
+                missing.append(file)
+        if usage is not None:
+            print(f"✅ Saved {len(written)} files from one batch "
+                  f"(tokens in: {usage['input_tokens']}, out: {usage['output_tokens']})")
 
-                # Save assistant reply back to conversation
-                self.messages.append({"role": "assistant", "content": reply})
+        errors = {}
+        for file in missing:
+            try:
+                written.append(self.process_file(file, isolated=True, repair=repairs.get(file.name)))
+            except Exception as e:
+                errors[file.name] = e
+        if errors:
+            raise BatchError(errors)
+        return written
 
-                with open(self.output_dir / f"{file.stem}.spec.js", "w", encoding="utf-8") as f:
-                    f.write(reply)
-                clean_code_fences(self.output_dir)
+    def plan_work(self, files):
+        """
+        Decide which files are generated on their own and which are packed into batches.
+        :param files: The OpenAPI spec file paths to generate.
+        :return: An iterable of work items: a single file, or a list of files for a batch. Without batching
+            the files are passed through as they come, so a generator of operations is consumed lazily.
+        """
+        if not (self.batcher.enabled and self.stateless):
+            return files
+        files = list(files)
+        by_name = {file.name: file for file in files}
+        specs = {}
+        for file in files:
+            try:
+                specs[file.name] = self.read_spec(file)
+            except Exception:
+                pass  # Unreadable files are generated on their own and fail there with a clear error.
+        batches, singles = self.batcher.plan(specs)
+        singles += [name for name in by_name if name not in specs]
+        print(f"📦 Packed {sum(len(b) for b in batches)} small operations into {len(batches)} batches")
+        return [[by_name[name] for name in batch] for batch in batches] + [by_name[name] for name in singles]
+
+    def process_item(self, item):
+        """Process one work item from plan_work()."""
+        if isinstance(item, list):
+            return self.process_batch(item)
+        return self.process_file(item)
+
+    def collect_result(self, future, item):
+        """Wait for a submitted work item and record its failure, if any."""
+        try:
+            future.result()
+        except Exception as e:
+            self.record_failure(item, e)
+
+    def record_failure(self, item, error: Exception):
+        """Record the failure of a work item per file."""
+        errors = error.errors if isinstance(error, BatchError) else {
+            file.name: error for file in (item if isinstance(item, list) else [item])
+        }
+        for name, file_error in errors.items():
+            self.failures[name] = str(file_error)
+            print(f"❌ Failed to process {name}: {file_error}")
+
+    @staticmethod
+    def repair_note(output_name: str, error: str, code: str = None) -> str:
+        """
+        Build the instructions appended to a prompt to regenerate a test file that does not parse.
+        :param output_name: The test file name.
+        :param error: The parser error reported for it.
+        :param code: The broken code, when it fits in the prompt.
+        :return: Instruction text.
+        """
+        note = f"\nThe previously generated {output_name} is not valid JavaScript. Parser error:\n{error}\n"
+        if code is not None:
+            note += f"\nPrevious code of {output_name}:\n{code}\n"
+        return note + f"\nReturn the complete corrected {output_name}.\n"
 
-                print(f"✅ Saved LLM response for {file.name}")
+    def regenerate_with_errors(self, output_files, errors: dict):
+        """
+        Regenerate test files that do not parse the way they were first generated: a file from a batch reply
+        is regenerated in a batch with the others of its batch that failed, any other file through
+        process_file() and its context window guard (split into content-type calls when too big).
+        :param output_files: The broken test files, all from the same batch or a single file.
+        :param errors: Broken test file -> parser error.
+        :return: The paths of the rewritten test files.
+        """
+        for output_file in output_files:
+            message = (errors[output_file].splitlines() or ["syntax error"])[-1]
+            print(f"🔧 Regenerating {output_file.name}: {message}")
+        batch = self.batches.get(output_files[0])
+        if batch is None:
+            return [self.process_file(self.sources[output_files[0]], isolated=True, repair=errors[output_files[0]])]
+
+        files = [self.sources[output_file] for output_file in output_files]
+        try:
+            written = self.process_batch(files, {self.sources[f].name: errors[f] for f in output_files})
+        finally:
+            # Replace the cached reply of the original batch with the current files of all its members, so a
+            # rerun does not bring the broken ones back.
+            key, members = batch
+            parts = {}
+            for member in members:
+                member_file = self.output_dir / f"{member.stem}.spec.js"
+                if member_file.exists():
+                    parts[member_file.name] = member_file.read_text(encoding="utf-8")
+            self.cache.put(key, self.batcher.join_reply(parts), file=members[0].name, model=self.model)
+        return written
+
+    def fix_syntax_errors(self):
+        """
+        Syntax-check the files written in this run and regenerate only the ones that fail, up to
+        SYNTAX_CHECK_RETRIES times. Files still broken after that are reported as failures, dropped from the
+        manifest (so the next run generates them again) and renamed to .spec.js.broken, so they do not stop
+        the whole suite from loading.
+        """
+        if not self.syntax_checker.enabled or not self.written_files:
+            return
+        started = time.perf_counter()
+        errors = self.syntax_checker.check_files(self.written_files)
+        print(f"🔎 Syntax-checked {len(self.written_files)} files in {time.perf_counter() - started:.1f}s: "
+              f"{len(errors)} failed")
+
+        for attempt in range(1, self.syntax_checker.retries + 1):
+            if not errors:
+                break
+            print(f"🔧 Regenerating {len(errors)} files that do not parse "
+                  f"(attempt {attempt}/{self.syntax_checker.retries})")
+            groups = {}
+            for output_file in errors:
+                batch = self.batches.get(output_file)
+                groups.setdefault(batch[0] if batch else output_file, []).append(output_file)
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {executor.submit(self.regenerate_with_errors, output_files, errors): output_files
+                           for output_files in groups.values()}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        names = ", ".join(output_file.name for output_file in futures[future])
+                        print(f"❌ Failed to regenerate {names}: {e}")
+            errors = self.syntax_checker.check_files(errors)
+
+        for output_file, error in errors.items():
+            with self._lock:
+                self.written_files.remove(output_file)
+            if self.manifest is not None:
+                self.manifest.remove(output_file.name)
+            os.replace(output_file, broken_file(output_file))
+            print(f"🚧 Moved {output_file.name} aside to {broken_file(output_file).name}")
+            self.failures[self.sources[output_file].name] = f"{output_file.name} does not parse: {error}"
+
+    def run(self, specs=None):
+        """
+        Process each OpenAPI spec file in the input directory, generate Playwright test code using the LLM,
+        and save the output to the output directory.
 
-            except Exception as e:
-                print(f"❌ Failed to process {file.name}: {e}")
+        With a concurrency above 1 the operations are generated in a thread pool, each call carrying only
+        the system prompt and its own operation, and every result is written as soon as its call finishes.
+        Failures are collected per file in ``self.failures`` and token counts in ``self.token_usage``.
+        :param specs: Optional iterable (e.g. PathMethodExtractor.iter_operations()) of in-memory
+            ExtractedOperation objects to generate instead of the spec files in the input directory.
+        :return: None
+        """
+        files = self.spec_files() if specs is None else specs
+        self.failures = {}
+        self.token_usage = {}
+        self.written_files = []
+        self.sources = {}
+        self.batches = {}
+        mode = "stateless" if self.stateless else "conversation"
+        print(f"🧠 Generation mode: {mode}, spec encoding: {self.spec_encoding}")
+        if self.stateless:
+            prefix = json.dumps([self.messages[0], *self.few_shot_messages], ensure_ascii=False)
+            print(f"🧷 Static prompt prefix: ~{estimate_tokens(prefix)} tokens "
+                  f"(sha256 {hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:12]})")
+
+        work = self.plan_work(files)
+        try:
+            if self.concurrency == 1:
+                for item in work:
+                    try:
+                        self.process_item(item)
+                    except Exception as e:
+                        self.record_failure(item, e)
+            else:
+                print(f"🚀 Generating with concurrency {self.concurrency}")
+                with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                    # Submit as the work comes in, keeping only a couple of items per worker queued.
+                    futures = {}
+                    for item in work:
+                        if len(futures) >= 2 * self.concurrency:
+                            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                self.collect_result(future, futures.pop(future))
+                        futures[executor.submit(self.process_item, item)] = item
+                    for future in as_completed(futures):
+                        self.collect_result(future, futures[future])
+            self.fix_syntax_errors()
+        finally:
+            # Saved even on interruption so finished files are not regenerated next time.
+            if self.manifest is not None:
+                self.manifest.save()
+
+        totals = self.usage_totals()
+        print(f"🔢 Tokens used: {totals['input_tokens']} input, {totals['output_tokens']} output, "
+              f"{totals['total_tokens']} total over {len(self.token_usage)} calls")
+        if totals["input_tokens"]:
+            ratio = totals["cache_read_tokens"] / totals["input_tokens"]
+            print(f"🧷 Prompt cache: {totals['cache_read_tokens']} input tokens read from cache ({ratio:.0%}), "
+                  f"{totals['cache_creation_tokens']} written")
+        if self.cache.enabled:
+            print(f"♻️ LLM cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        # Replies are already cleaned before they are written; the file pass is an opt-in safety net.
+        if os.getenv("CLEAN_CODE_FENCES", "false").lower() == "true":
+            clean_code_fences(self.output_dir, files=self.written_files)
+        if self.failures:
+            print(f"⚠️ {len(self.failures)} of {len(self.failures) + len(self.written_files)} files failed:")
+            for name, error in sorted(self.failures.items()):
+                print(f"   - {name}: {error}")
 
 
 class GlobalSetup:
-    def __init__(self, target_folder: str, swagger_file: str, output_dir: str = None):
+    def __init__(self, target_folder: str, spec: SpecDocument, output_dir: str = None):
         self.playwright_dir = Path(target_folder)
-        self.swagger_file = Path(swagger_file)
+        self.spec = SpecDocument.coerce(spec)
         self.output_dir = Path(output_dir) if output_dir else self.playwright_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.llm = llm
@@ -146,31 +680,29 @@ class GlobalSetup:
 
     def load_spec(self):
         """
-        Load the OpenAPI spec file.
+        Serialise the shared OpenAPI spec in its original format, or in LLM_SPEC_ENCODING when it is set.
         :return: The spec as a string.
         """
-        with open(self.swagger_file, "r", encoding="utf-8") as f:
-            if self.swagger_file.suffix.lower() in [".yaml", ".yml"]:
-                spec = yaml.safe_load(f)
-                return yaml.dump(spec)
-            elif self.swagger_file.suffix.lower() == ".json":
-                spec = json.load(f)
-                return json.dumps(spec, indent=2)
-            else:
-                raise ValueError("Unsupported Swagger file format.")
+        if os.getenv("LLM_SPEC_ENCODING"):
+            return encode_spec(self.spec.data)
+        if self.spec.is_yaml:
+            return yaml.dump(self.spec.data)
+        return json.dumps(self.spec.data, indent=2)
 
     def build_global_setup_prompt(self, spec: dict, filename: str) -> str:
         """
         Build the prompt for generating the global setup file.
-        :param spec: The OpenAPI spec as a dict.
+        :param spec: The OpenAPI spec, as a dict or already serialised by load_spec().
         :param filename: The name of the OpenAPI spec file.
         :return: A formatted prompt string.
         """
+        # A serialised spec is embedded as is; JSON-encoding it again would escape every newline and quote.
+        text = spec if isinstance(spec, str) else json.dumps(spec, indent=2)
         return f"""
         OpenAPI file: **{filename}**
 
         Spec:
-        {json.dumps(spec, indent=2)}
+        {text}
 
         Generate the global setup .js file.
         """
@@ -182,44 +714,157 @@ class GlobalSetup:
         """
         spec = self.load_spec()
 
-        user_message = self.build_global_setup_prompt(spec, self.swagger_file)
+        user_message = self.build_global_setup_prompt(spec, self.spec.name)
 
         self.messages.append({"role": "user", "content": user_message})
         lc_messages = to_langchain_messages(self.messages)
 
-        # Call your LangChain LLM
-        response = llm.invoke(lc_messages)
+        # Call your LangChain LLM, retrying throttled and transient failures
+        response = RateLimiter.from_env(llm.get_model_info()[0]).call(lambda: llm.invoke(lc_messages),
+                                                                      name="global-setup.js")
 
         # Extract the content
-        reply = response.content.strip()
+        reply = strip_code_fences(response.content)
+
+        atomic_write_text(self.output_dir / "global-setup.js", reply)
+
+
+CODE_FENCE_OPENINGS = ("```javascript", "```js", "```typescript", "```ts", "```")
+# Line boundaries as recognised by str.splitlines().
+LINE_BREAK = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+class StreamResult:
+    """Minimal stand-in for a LangChain message after a streamed call: only the summed usage."""
+
+    def __init__(self, usage_metadata: dict):
+        self.usage_metadata = usage_metadata
 
-        with open(self.output_dir / "global-setup.js", "w", encoding="utf-8") as f:
-            f.write(reply)
-        clean_code_fences(self.output_dir)
 
+def chunk_text(chunk) -> str:
+    """Text of a streamed LangChain chunk (content may be a string or a list of content blocks)."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content or [])
 
-def clean_code_fences(root_folder, extensions=[".js", ".ts", ]):
+
+def broken_file(path: Path) -> Path:
+    """Where a generated test that does not parse is moved, out of Playwright's test match."""
+    return path.with_name(path.name + ".broken")
+
+
+def temp_path_for(path: Path) -> Path:
+    """Hidden, writer-unique temp file next to ``path`` (not matched by Playwright's *.spec.js pattern)."""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.partial")
+
+
+def atomic_write_text(path: Path, text: str):
+    """
+    Write a file via a temp file and os.replace, so readers never see a half-written file.
+    :param path: Destination path.
+    :param text: File content.
+    :return: None
+    """
+    path = Path(path)
+    tmp_path = temp_path_for(path)
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class StreamingFenceStripper:
+    """
+    Removes the opening and closing Markdown code fences from a reply that arrives in chunks, producing
+    exactly what strip_code_fences() produces for the whole reply.
+
+    Text is released up to the last line break that is followed by more code. Leading whitespace and an
+    opening fence line are dropped; the last line, which may turn out to be a closing fence, and the
+    whitespace after it are held back until more code follows or the stream ends.
+    """
+
+    def __init__(self):
+        self.pending = ""
+        self.started = False
+
+    def feed(self, text: str) -> str:
+        """
+        Add a chunk of the reply.
+        :param text: The chunk.
+        :return: The text that can be written now.
+        """
+        self.pending += text
+        if not self.started:
+            self.pending = self.pending.lstrip()
+            first = LINE_BREAK.search(self.pending)
+            # A trailing "\r" may still be the first half of "\r\n".
+            if first is None or (first.group() == "\r" and first.end() == len(self.pending)):
+                return ""
+            self.started = True
+            if self.pending[:first.start()].strip() in CODE_FENCE_OPENINGS:
+                self.pending = self.pending[first.end():]
+        code_end = len(self.pending.rstrip())
+        release = 0
+        for match in LINE_BREAK.finditer(self.pending, 0, code_end):
+            release = match.end()
+        out, self.pending = self.pending[:release], self.pending[release:]
+        return out
+
+    def finish(self) -> str:
+        """
+        Flush the end of the reply, dropping a trailing closing fence.
+        :return: The remaining text.
+        """
+        pending, self.pending = self.pending, ""
+        if not self.started:
+            return strip_code_fences(pending)
+        last_line = pending.rstrip()
+        return "" if last_line.strip() == "```" else last_line
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Remove the starting and ending Markdown code fences from an LLM reply.
+    :param text: The reply text.
+    :return: The code without the surrounding fences.
+    """
+    lines = text.strip().splitlines(keepends=True)
+    if lines and lines[0].strip() in CODE_FENCE_OPENINGS:
+        lines = lines[1:]
+    if lines and lines[-1].strip() == "```":
+        lines = lines[:-1]
+    return "".join(lines)
+
+
+def clean_code_fences(root_folder, extensions=[".js", ".ts", ], files=None):
     """
-    Remove starting and ending Markdown code fences from all files in the given folder with specified extensions.
-    :param root_folder: The root folder to search.
+    Remove starting and ending Markdown code fences from files with the specified extensions.
+    :param root_folder: The root folder to search when no explicit file list is given.
     :param extensions: List of file extensions to process.
+    :param files: Only clean these files (e.g. the ones written in the current run).
     :return: None
     """
-    for subdir, _, files in os.walk(root_folder):
-        for filename in files:
-            if any(filename.endswith(ext) for ext in extensions):
-                file_path = os.path.join(subdir, filename)
+    if files is None:
+        files = [
+            os.path.join(subdir, filename)
+            for subdir, _, filenames in os.walk(root_folder)
+            for filename in filenames
+        ]
 
-                with open(file_path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
+    for file_path in files:
+        if not any(str(file_path).endswith(ext) for ext in extensions):
+            continue
 
-                # Remove starting and ending Markdown code fences
-                if lines and lines[0].strip() == "```javascript":
-                    lines = lines[1:]
-                if lines and lines[-1].strip() == "```":
-                    lines = lines[:-1]
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
 
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.writelines(lines)
+        cleaned = strip_code_fences(content)
+        if cleaned != content:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(cleaned)
 
-    print(f"✅ Cleaned all files in: {root_folder}")
+    print(f"✅ Cleaned {len(files)} files in: {root_folder}")
@@ -0,0 +1,167 @@
+import json
+import os
+import re
+from RestPlaywright.utils.operation_splitter import ContextWindowGuard, estimate_tokens, find_operation
+from RestPlaywright.utils.spec_refs import component_ref
+
+FILE_MARKER = "// === FILE: {name} ==="
+FILE_MARKER_PATTERN = re.compile(r"^\s*//\s*===\s*FILE:\s*(?P<name>\S+)\s*===\s*$", re.MULTILINE)
+
+
+class OperationBatcher:
+    """
+    Packs several small operations into one LLM request.
+
+    Operations whose expected output is small are grouped, in name order so neighbouring paths that share
+    schemas land together, until the batch reaches the input token budget, the output budget or the
+    operation limit. The batch prompt carries each operation once and the union of their components once,
+    and asks for a multi-file reply that split_reply() cuts back into individual test files.
+    """
+
+    def __init__(self, token_budget: int = 0, max_output_tokens: int = 8192, small_output_tokens: int = 1500,
+                 max_operations: int = 8):
+        self.token_budget = token_budget
+        self.max_output_tokens = max_output_tokens
+        self.small_output_tokens = small_output_tokens
+        self.max_operations = max_operations
+        self.guard = ContextWindowGuard(max_output_tokens=max_output_tokens)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the batcher from LLM_BATCH_TOKEN_BUDGET (0 disables batching), LLM_BATCH_SMALL_OUTPUT_TOKENS,
+        LLM_BATCH_MAX_OPERATIONS and LLM_MAX_OUTPUT_TOKENS.
+        """
+        return cls(
+            token_budget=int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "0")),
+            max_output_tokens=int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "8192")),
+            small_output_tokens=int(os.getenv("LLM_BATCH_SMALL_OUTPUT_TOKENS", "1500")),
+            max_operations=int(os.getenv("LLM_BATCH_MAX_OPERATIONS", "8")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.token_budget > 0 and self.max_operations > 1
+
+    def plan(self, specs: dict):
+        """
+        Group small operations into batches.
+        :param specs: name -> unresolved mini-spec, for every operation to generate.
+        :return: A (batches, singles) tuple: a list of name lists with two or more entries each, and the
+            names generated on their own.
+        """
+        batches, singles = [], []
+        current, current_refs = [], set()
+        current_tokens = current_output = 0
+
+        def flush():
+            if len(current) > 1:
+                batches.append(list(current))
+            else:
+                singles.extend(current)
+
+        for name in sorted(specs):
+            spec = specs[name]
+            _, _, operation = find_operation(spec)
+            output_tokens = self.guard.expected_output_tokens(operation) if operation else self.max_output_tokens
+            if not self.enabled or output_tokens > self.small_output_tokens:
+                singles.append(name)
+                continue
+
+            # Cost of adding this operation: its paths plus the components the batch does not carry yet.
+            refs = self._component_refs(spec)
+            cost = estimate_tokens(json.dumps(spec.get("paths", {}), separators=(",", ":")))
+            cost += sum(self._component_tokens(spec, ref) for ref in refs - current_refs)
+
+            if current and (current_tokens + cost > self.token_budget
+                            or current_output + output_tokens > self.max_output_tokens
+                            or len(current) >= self.max_operations):
+                flush()
+                current, current_refs = [], set()
+                current_tokens = current_output = 0
+                cost = estimate_tokens(json.dumps(spec.get("paths", {}), separators=(",", ":")))
+                cost += sum(self._component_tokens(spec, ref) for ref in refs)
+
+            current.append(name)
+            current_refs |= refs
+            current_tokens += cost
+            current_output += output_tokens
+        flush()
+        return batches, singles
+
+    @staticmethod
+    def _component_refs(spec: dict) -> set:
+        return {
+            component_ref(section, name)
+            for section, items in (spec.get("components", {}) or {}).items()
+            for name in items
+        }
+
+    @staticmethod
+    def _component_tokens(spec: dict, ref: str) -> int:
+        section, name = ref[len("#/components/"):].split("/", 1)
+        return estimate_tokens(json.dumps(spec["components"][section][name.replace("~1", "/").replace("~0", "~")],
+                                          separators=(",", ":")))
+
+    @staticmethod
+    def build_batch_spec(specs) -> dict:
+        """
+        Combine unresolved mini-specs into one spec, with every shared component included once.
+        :param specs: The mini-specs of the batch.
+        :return: The combined spec.
+        """
+        combined = {"paths": {}, "components": {}}
+        for spec in specs:
+            for path, path_item in spec.get("paths", {}).items():
+                combined["paths"].setdefault(path, {}).update(path_item)
+            for section, items in (spec.get("components", {}) or {}).items():
+                combined["components"].setdefault(section, {}).update(items)
+            if spec.get("security") and "security" not in combined:
+                combined["security"] = spec["security"]
+        return combined
+
+    @staticmethod
+    def instructions(file_names) -> str:
+        """
+        Build the instructions appended to a batch prompt.
+        :param file_names: The test file names expected back, in order.
+        :return: Instruction text.
+        """
+        markers = "\n".join(FILE_MARKER.format(name=name) for name in file_names)
+        return (
+            "\nThis spec contains several operations. Generate one complete, independent .spec.js file per "
+            "operation, each with its own imports. Return all files in one reply, each file preceded by its "
+            "marker line exactly as below, and nothing else:\n"
+            f"{markers}\n"
+        )
+
+    @staticmethod
+    def join_reply(parts: dict) -> str:
+        """
+        Build a multi-file reply, the inverse of split_reply().
+        :param parts: Test file name -> code.
+        :return: The files, each preceded by its marker line.
+        """
+        return "\n".join(f"{FILE_MARKER.format(name=name)}\n{code.rstrip()}\n" for name, code in parts.items())
+
+    @staticmethod
+    def split_reply(reply: str) -> dict:
+        """
+        Split a multi-file batch reply back into individual files.
+        :param reply: The LLM reply.
+        :return: file name -> code, without Markdown code fences.
+        """
+        matches = list(FILE_MARKER_PATTERN.finditer(reply))
+        files = {}
+        for index, match in enumerate(matches):
+            end = matches[index + 1].start() if index + 1 < len(matches) else len(reply)
+            lines = reply[match.end():end].strip().splitlines()
+            # A fence may wrap each file or the whole reply, so drop fence lines at both ends of every chunk.
+            while lines and lines[0].strip().startswith("```"):
+                lines.pop(0)
+            while lines and lines[-1].strip().startswith("```"):
+                lines.pop()
+            code = "\n".join(lines).strip()
+            if code:
+                files[match.group("name")] = code
+        return files
@@ -0,0 +1,286 @@
+import json
+import os
+import re
+from RestPlaywright.utils.spec_refs import HTTP_METHODS
+
+# Rough size of one generated `test(...)` block and of the imports/fixtures around them, in tokens.
+TOKENS_PER_TEST = 220
+FILE_OVERHEAD_TOKENS = 300
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, provider-independent token estimate (about four characters per token).
+    :param text: The text to measure.
+    :return: Estimated number of tokens.
+    """
+    return len(text) // 4 + 1
+
+
+def find_operation(spec: dict):
+    """
+    Locate the single operation of a per-operation mini-spec.
+    :param spec: The mini-spec.
+    :return: A (path, method, operation) tuple, or (None, None, None) if there is none.
+    """
+    for path, path_item in spec.get("paths", {}).items():
+        for method, operation in path_item.items():
+            if method.lower() in HTTP_METHODS:
+                return path, method, operation
+    return None, None, None
+
+
+def content_types(operation: dict):
+    """
+    Return the request and response content-types an operation declares.
+    :param operation: The operation object.
+    :return: A (request_types, response_types) tuple of lists, in declaration order.
+    """
+    request_types = list(((operation.get("requestBody") or {}).get("content") or {}).keys())
+    response_types = []
+    for response in (operation.get("responses") or {}).values():
+        for content_type in ((response or {}).get("content") or {}):
+            if content_type not in response_types:
+                response_types.append(content_type)
+    return request_types, response_types
+
+
+class ContextWindowGuard:
+    """
+    Estimates how large a generation will be and splits operations that would not fit.
+
+    The prompt asks for one `test.describe` per request x response content-type pair and one test per status
+    code, so the expected output grows with their product. Operations over the input or output budget are
+    split into one sub-generation per content-type combination, each narrowed to that pair.
+    """
+
+    def __init__(self, max_input_tokens: int = 100000, max_output_tokens: int = 8192):
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+
+    @classmethod
+    def from_env(cls):
+        """Build the guard from LLM_MAX_INPUT_TOKENS / LLM_MAX_OUTPUT_TOKENS."""
+        return cls(
+            max_input_tokens=int(os.getenv("LLM_MAX_INPUT_TOKENS", "100000")),
+            max_output_tokens=int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "8192")),
+        )
+
+    def expected_output_tokens(self, operation: dict) -> int:
+        """
+        Estimate the size of the generated test file for an operation.
+        :param operation: The operation object.
+        :return: Estimated output tokens.
+        """
+        request_types, response_types = content_types(operation)
+        combinations = max(1, len(request_types)) * max(1, len(response_types))
+        status_codes = max(1, len(operation.get("responses") or {}))
+        return FILE_OVERHEAD_TOKENS + combinations * status_codes * TOKENS_PER_TEST
+
+    def is_over_budget(self, spec: dict, prompt_tokens: int) -> bool:
+        """
+        Check whether generating the spec in one call would exceed the budget.
+        :param spec: The mini-spec.
+        :param prompt_tokens: Estimated tokens of the full prompt (system prompt included).
+        :return: True when the call should be split.
+        """
+        _, _, operation = find_operation(spec)
+        if operation is None:
+            return False
+        return (prompt_tokens > self.max_input_tokens
+                or self.expected_output_tokens(operation) > self.max_output_tokens)
+
+    def split(self, spec: dict):
+        """
+        Split a mini-spec into one sub-spec per request x response content-type combination.
+        Schemas are shared with the original spec, only the containers along the way are copied.
+        :param spec: The mini-spec.
+        :return: A list of (label, sub_spec) tuples; a single (None, spec) entry when it cannot be split.
+        """
+        path, method, operation = find_operation(spec)
+        if operation is None:
+            return [(None, spec)]
+        request_types, response_types = content_types(operation)
+        if max(1, len(request_types)) * max(1, len(response_types)) <= 1:
+            return [(None, spec)]
+
+        pieces = []
+        for request_type in request_types or [None]:
+            for response_type in response_types or [None]:
+                sub_operation = dict(operation)
+                if request_type is not None:
+                    request_body = dict(operation["requestBody"])
+                    request_body["content"] = {request_type: request_body["content"][request_type]}
+                    sub_operation["requestBody"] = request_body
+                responses = {}
+                for status, response in (operation.get("responses") or {}).items():
+                    response = dict(response or {})
+                    content = response.get("content") or {}
+                    if content:
+                        response["content"] = {k: v for k, v in content.items() if k == response_type}
+                        if not response["content"]:
+                            del response["content"]
+                    responses[status] = response
+                sub_operation["responses"] = responses
+
+                path_item = dict(spec["paths"][path])
+                path_item[method] = sub_operation
+                sub_spec = dict(spec)
+                sub_spec["paths"] = {path: path_item}
+                label = f"{request_type or 'no body'} → {response_type or 'no content'}"
+                pieces.append((label, sub_spec))
+        return pieces
+
+
+IMPORT_START = re.compile(r"^\s*import\b")
+IMPORT_END = re.compile(r"""(\bfrom\s+['"][^'"]+['"]|^\s*import\s+['"][^'"]+['"])\s*;?\s*$""")
+DIRECTIVE = re.compile(r"""^\s*(['"])use [a-z ]+\1\s*;?\s*$""")
+# import <clause> from '<source>'  |  import '<source>'
+IMPORT_STATEMENT = re.compile(
+    r"""^\s*import\s+(?:(?P<clause>[^'"]+?)\s+from\s+)?(?P<source>(['"])[^'"]+\3)\s*;?\s*$""", re.DOTALL)
+IDENTIFIER = r"[A-Za-z_$][\w$]*"
+NAMED_SPECIFIER = re.compile(rf"""^({IDENTIFIER}|(['"])[^'"]+\2)(?:\s+as\s+({IDENTIFIER}))?$""")
+
+
+def split_imports(code: str):
+    """
+    Separate the leading import statements of a generated file from the rest of it.
+    Blank lines, comments (such as `// @ts-check`) and directives before and between the imports are skipped.
+    :param code: The generated JavaScript.
+    :return: A (imports, body, header) tuple; imports is a list of import statements and header the comments
+        and directives found among them.
+    """
+    lines = code.splitlines()
+    imports = []
+    header = []
+    current = []
+    in_comment = False
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        stripped = line.strip()
+        if current:
+            current.append(line)
+            if IMPORT_END.search(line):
+                imports.append("\n".join(current))
+                current = []
+        elif in_comment:
+            header.append(line)
+            in_comment = "*/" not in stripped
+        elif IMPORT_START.match(line):
+            if IMPORT_END.search(line):
+                imports.append(line)
+            else:
+                current = [line]
+        elif stripped.startswith("/*"):
+            header.append(line)
+            in_comment = "*/" not in stripped
+        elif stripped.startswith("//") or DIRECTIVE.match(line):
+            header.append(line)
+        elif stripped:
+            break
+        index += 1
+    return imports, "\n".join(lines[index:]).strip("\n"), header
+
+
+def parse_import(statement: str):
+    """
+    Break an import statement into its bindings.
+    :param statement: One import statement (possibly spanning several lines).
+    :return: A (source, default, namespace, named) tuple, where named is a list of (imported, local) pairs and
+        source keeps its quotes; or None when the statement is not a plain static import.
+    """
+    match = IMPORT_STATEMENT.match(statement)
+    if match is None:
+        return None
+    source, clause = match.group("source"), " ".join((match.group("clause") or "").split())
+    default = namespace = None
+    named = []
+    braces = re.search(r"\{(.*)\}", clause)
+    if braces:
+        for specifier in braces.group(1).split(","):
+            specifier = specifier.strip()
+            if not specifier:
+                continue
+            parsed = NAMED_SPECIFIER.match(specifier)
+            if parsed is None:
+                return None
+            named.append((parsed.group(1), parsed.group(3) or parsed.group(1)))
+        clause = (clause[:braces.start()] + clause[braces.end():]).strip()
+    for part in (part.strip() for part in clause.split(",")):
+        if not part:
+            continue
+        star = re.fullmatch(rf"\*\s*as\s+({IDENTIFIER})", part)
+        if star:
+            namespace = star.group(1)
+        elif re.fullmatch(IDENTIFIER, part) and part != "type":
+            default = part
+        else:
+            return None
+    return source, default, namespace, named
+
+
+def merge_imports(statements):
+    """
+    Merge import statements into one import per module, so no name is declared twice.
+    Named specifiers of the same module are combined; a local name already bound by an earlier import (of
+    any module) is dropped. Statements that cannot be parsed are kept once, verbatim.
+    :param statements: Import statements in order of appearance.
+    :return: The merged import statements.
+    """
+    modules = {}
+    verbatim = []
+    bound = set()
+    for statement in statements:
+        parsed = parse_import(statement)
+        if parsed is None:
+            # Compare ignoring layout so "import { test } from 'x';" and a multi-line form are one import.
+            normalized = " ".join(statement.replace("{", " { ").replace("}", " } ").split()).rstrip(";")
+            if normalized not in (n for n, _ in verbatim):
+                verbatim.append((normalized, statement))
+            continue
+        source, default, namespace, named = parsed
+        module = modules.setdefault(source[1:-1], {"quoted": source, "defaults": [], "namespaces": [], "named": []})
+        for local, target in ((default, module["defaults"]), (namespace, module["namespaces"])):
+            if local and local not in bound:
+                bound.add(local)
+                target.append(local)
+        for imported, local in named:
+            if local not in bound:
+                bound.add(local)
+                module["named"].append(imported if imported == local else f"{imported} as {local}")
+
+    merged = []
+    for module in modules.values():
+        source = module["quoted"]
+        defaults, namespaces = list(module["defaults"]), list(module["namespaces"])
+        named = f"{{ {', '.join(module['named'])} }}" if module["named"] else None
+        first = [name for name in (defaults.pop(0) if defaults else None, named) if name]
+        if first:
+            merged.append(f"import {', '.join(first)} from {source};")
+        merged += [f"import {name} from {source};" for name in defaults]
+        merged += [f"import * as {name} from {source};" for name in namespaces]
+        if not (first or defaults or namespaces):
+            merged.append(f"import {source};")
+    return merged + [statement for _, statement in verbatim]
+
+
+def merge_spec_files(parts) -> str:
+    """
+    Merge the code generated for the pieces of a split operation into one .spec.js file with a single set
+    of imports. Each piece's body is wrapped in its own `test.describe` so top-level constants of different
+    pieces cannot clash.
+    :param parts: A list of (label, code) tuples.
+    :return: The merged file content.
+    """
+    statements = []
+    header = []
+    bodies = []
+    for label, code in parts:
+        piece_imports, body, piece_header = split_imports(code)
+        statements += piece_imports
+        # The file header (e.g. `// @ts-check`) is taken from the first piece that has one.
+        header = header or piece_header
+        bodies.append(f"test.describe({json.dumps(label, ensure_ascii=False)}, () => {{\n{body}\n}})")
+    lines = header + merge_imports(statements)
+    return "\n".join(lines) + "\n\n" + "\n\n".join(bodies) + "\n"
@@ -1,27 +1,38 @@
-import os
 import json
+import os
 import re
-import yaml
+from RestPlaywright.utils.spec_document import SpecDocument
+
+# Regenerated on every run between these markers: the test files per tag and the worker count.
+BLOCK_START = "// <restplaywright:projects>"
+BLOCK_END = "// </restplaywright:projects>"
+UNTAGGED_PROJECT = "untagged"
 
 
 class PlaywrightConfigUpdater:
-    def __init__(self, swagger_path, project_path):
-        self.swagger_path = swagger_path
+    def __init__(self, spec: SpecDocument, project_path, file_names: dict = None):
+        self.spec = SpecDocument.coerce(spec)
         self.project_path = project_path
         self.config_path = os.path.join(project_path, 'playwright.config.js')
+        # (path, method) -> generated test file name, see PathMethodExtractor.test_file_names().
+        self.file_names = file_names
+        # One Playwright project per OpenAPI tag, so a group of operations can be run on its own.
+        self.tag_projects = os.getenv("PLAYWRIGHT_TAG_PROJECTS", "true").lower() == "true"
+        # API tests mostly wait on the network, so more workers than CPUs pay off.
+        self.workers_per_cpu = float(os.getenv("PLAYWRIGHT_WORKERS_PER_CPU", "2"))
 
     # ---------- Public API ----------
     def run(self):
         """Main method to update playwright.config.js based on Swagger."""
         self._validate_paths()
-        swagger = self._load_swagger()
-        base_url = self._extract_base_url(swagger)
+        base_url = self._extract_base_url(self.spec.servers)
 
         print(f"🔍 Extracted baseURL: {base_url}")
         config_content = self._read_file(self.config_path)
 
         config_content = self._ensure_auth_block(config_content)
         config_content = self._remove_projects_block(config_content)
+        config_content = self._update_parallel_block(config_content)
         config_content = self._update_use_block(config_content, base_url)
         config_content = self._ensure_global_setup(config_content)
         config_content = self._update_reporter_block(config_content)
@@ -55,19 +66,106 @@ class PlaywrightConfigUpdater:
             flags=re.DOTALL
         )
 
+    def _group_tests_by_tag(self):
+        """
+        Group the generated test files by the first tag of their operation.
+        :return: A list of (project name, sorted file names), largest group first, so shards are deterministic
+            and the long projects start early.
+        """
+        file_names = self.file_names
+        if file_names is None:
+            from RestPlaywright.utils.swagger_extractor import PathMethodExtractor
+            file_names = PathMethodExtractor(self.spec, save_to_disk=False).test_file_names()
+        groups = {}
+        for path, method, operation in self.spec.operations():
+            tags = (operation or {}).get("tags") or [UNTAGGED_PROJECT]
+            groups.setdefault(str(tags[0]), []).append(file_names[(path, method)])
+        return sorted(((name, sorted(files)) for name, files in groups.items()), key=lambda g: (-len(g[1]), g[0]))
+
+    def _parallel_block(self):
+        """Build the generated block: test files per tag project and the worker count."""
+        operation_count = self.spec.operation_count
+        lines = [
+            f"{BLOCK_START} Generated from the OpenAPI spec on every run; edits here are overwritten.",
+            "const generatedTests = {",
+        ]
+        for name, files in self._group_tests_by_tag():
+            lines.append(f"  {json.dumps(name)}: {json.dumps(['**/' + file for file in files])},")
+        lines += [
+            "};",
+            "const generatedTestFiles = Object.values(generatedTests).flat();",
+            f"// {operation_count} operations: up to {self.workers_per_cpu:g} workers per CPU, never more than one per "
+            "operation; PLAYWRIGHT_WORKERS overrides.",
+            f"const generatedWorkers = Number(process.env.PLAYWRIGHT_WORKERS) || "
+            f"Math.max(1, Math.min({operation_count}, Math.round(os.cpus().length * {self.workers_per_cpu:g})));",
+            BLOCK_END,
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _update_parallel_block(self, content):
+        """
+        Run every test in parallel with a worker count sized to the suite and the machine running it, and
+        (with PLAYWRIGHT_TAG_PROJECTS) add one project per tag plus an "other" project for the remaining tests.
+        fullyParallel also lets `--shard` split the suite per test rather than per file.
+        """
+        content = re.sub(r"\n" + re.escape(BLOCK_START) + r".*?" + re.escape(BLOCK_END) + r"\n", "", content,
+                         flags=re.DOTALL)
+        # The `npm init playwright` default, which the generated worker count replaces.
+        content = re.sub(r"[ \t]*/\* Opt out of parallel tests on CI\. \*/\n", "", content)
+        if "export default defineConfig" not in content:
+            print("⚠️ No `export default defineConfig` in playwright.config.js; workers and projects left as they are.")
+            return content
+        if not re.search(r"^import os from 'os';", content, flags=re.MULTILINE):
+            content = re.sub(r"(import .*?;\n)", r"\1import os from 'os';\n", content, 1)
+        content = re.sub(r"(\n(?:/\*\*(?:(?!\*/).)*\*/\s*)?export default defineConfig)",
+                         lambda m: "\n" + self._parallel_block() + m.group(1), content, 1, flags=re.DOTALL)
+
+        settings = {"fullyParallel": "true", "workers": "generatedWorkers"}
+        for key, value in settings.items():
+            pattern = rf"^(\s*){key}:[^\n]*?,?[ \t]*$"
+            if re.search(pattern, content, flags=re.MULTILINE):
+                content = re.sub(pattern, rf"\g<1>{key}: {value},", content, 1, flags=re.MULTILINE)
+            else:
+                content = re.sub(r"(defineConfig\(\s*\{\s*)", rf"\g<1>{key}: {value},\n  ", content, 1)
+
+        if self.tag_projects:
+            projects = (
+                "projects: [\n"
+                "    ...Object.entries(generatedTests).map(([name, testMatch]) => ({ name, testMatch })),\n"
+                "    { name: 'other', testIgnore: generatedTestFiles },\n"
+                "  ],\n  "
+            )
+            # After globalSetup, which is inserted first in the object, so reruns keep the same order.
+            content = re.sub(r"(defineConfig\(\s*\{\s*(?:globalSetup:[^\n]*\n\s*)?)",
+                             lambda m: m.group(1) + projects, content, 1)
+        return content
+
     def _update_use_block(self, content, base_url):
-        """Update or insert baseURL and extraHTTPHeaders in the 'use' block."""
+        """Update or insert baseURL and extraHTTPHeaders in the 'use' block, in the indentation of its entries."""
 
         def replacer(match):
-            block = match.group(1)
-            block = re.sub(r'(//\s*)?baseURL:\s*[\'"].*?[\'"],?\n?', '', block)
+            use_indent, block = match.group(1), match.group(2)
+            # Drop the old baseURL entry (commented out or not) and any comment about it.
+            lines = [line for line in block.splitlines()
+                     if not re.match(r'\s*(//\s*)?baseURL:', line)
+                     and not re.match(r'\s*(//|/\*).*\bbase ?url\b', line, flags=re.IGNORECASE)]
+            while lines and not lines[0].strip():
+                lines.pop(0)
+            while lines and not lines[-1].strip():
+                lines.pop()
+            entry_indent = next((re.match(r'\s*', line).group(0) for line in lines if line.strip()),
+                                use_indent + "  ")
 
             if "extraHTTPHeaders" not in block:
-                block += "  extraHTTPHeaders,\n"
-
-            return f"use: {{\n  baseURL: '{base_url}',\n{block}  }}"
+                lines.append(f"{entry_indent}extraHTTPHeaders,")
+            lines = [
+                f"{entry_indent}/* Base URL of the API, set from the OpenAPI servers[0].url. */",
+                f"{entry_indent}baseURL: '{base_url}',",
+                *lines,
+            ]
+            return f"{use_indent}use: {{\n" + "\n".join(lines) + f"\n{use_indent}}}"
 
-        return re.sub(r'use:\s*{([^}]+)}', replacer, content, flags=re.DOTALL)
+        return re.sub(r'^([ \t]*)use:\s*{([^}]+)}', replacer, content, flags=re.DOTALL | re.MULTILINE)
 
     def _ensure_global_setup(self, content):
         """Ensure globalSetup is present."""
@@ -108,27 +206,14 @@ class PlaywrightConfigUpdater:
 
     # ---------- Helpers ----------
     def _validate_paths(self):
-        """Ensure swagger_path and config_path exist."""
-        if not os.path.isfile(self.swagger_path):
-            raise FileNotFoundError(f"Swagger file not found: {self.swagger_path}")
+        """Ensure config_path exists."""
         if not os.path.isfile(self.config_path):
             raise FileNotFoundError(f"playwright.config.js not found: {self.config_path}")
 
-    def _load_swagger(self):
-        """Load Swagger file (JSON or YAML) and return as dict."""
-        ext = os.path.splitext(self.swagger_path)[1].lower()
-        with open(self.swagger_path, 'r') as f:
-            if ext == '.json':
-                return json.load(f)
-            elif ext in ['.yaml', '.yml']:
-                return yaml.safe_load(f)
-            else:
-                raise ValueError("Swagger file must be .json or .yaml/.yml")
-
-    def _extract_base_url(self, swagger):
+    def _extract_base_url(self, servers):
         """Extract baseURL from swagger['servers'][0]['url']."""
         try:
-            return swagger['servers'][0]['url']
+            return servers[0]['url']
         except (KeyError, IndexError):
             raise ValueError("Swagger missing servers[0].url")
 
@@ -1,26 +1,50 @@
+import json
 import os
 import shutil
 import sys
 import subprocess
+from datetime import datetime
 from pathlib import Path
+from RestPlaywright.utils.state import STATE_DIR_NAME, get_state_dir
+
+# Written into .restplaywright/ once a project is set up or found, so later runs locate it in O(1).
+PROJECT_MARKER = "project.json"
+# Bundled, version-pinned project template used by the offline "template" scaffold mode.
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "playwright"
+# Folders that never contain the project but can hold hundreds of thousands of entries.
+DISCOVERY_SKIP_DIRS = {"node_modules", "allure-results", "allure-report", "test-results", "playwright-report",
+                       "blob-report"}
 
 
 class PlaywrightProjectManager:
     def __init__(self, target_folder: str):
         self.base_path = Path(target_folder).resolve()
+        # How many folder levels below the target folder the fallback walk looks for a project.
+        self.discovery_depth = int(os.getenv("PLAYWRIGHT_DISCOVERY_DEPTH", "3"))
+        # "template" writes the bundled project and installs offline; "npm" runs npm init playwright.
+        self.scaffold = os.getenv("PLAYWRIGHT_SCAFFOLD", "template").lower()
+        self.template_dir = Path(os.getenv("PLAYWRIGHT_TEMPLATE_DIR") or TEMPLATE_DIR)
         print(f"📁 Target folder: {self.base_path}")
 
-    def run_command(self, command, cwd):
-        """Run a shell command in the specified directory."""
+    def run_command(self, command, cwd, exit_on_error: bool = True) -> bool:
+        """
+        Run a shell command in the specified directory.
+        :param exit_on_error: Exit the program when the command fails; otherwise report it and return False.
+        :return: True if the command succeeded.
+        """
         try:
             print(f"▶️ Running: {command}")
             subprocess.run(command, cwd=cwd, check=True, shell=True)
+            return True
         except FileNotFoundError:
             print(f"❌ Command not found: {command.split()[0]}. Ensure it's installed and in your PATH.")
-            sys.exit(1)
+            if exit_on_error:
+                sys.exit(1)
         except subprocess.CalledProcessError as e:
             print(f"❌ Command failed with exit code {e.returncode}: {command}")
-            sys.exit(1)
+            if exit_on_error:
+                sys.exit(1)
+        return False
 
     def is_playwright_project(self, folder: Path) -> bool:
         """Check if the given folder is a Playwright project."""
@@ -31,12 +55,68 @@ class PlaywrightProjectManager:
         ])
 
     def find_any_playwright_project(self, base_path: Path) -> bool:
-        """Recursively search for any Playwright project in the base_path."""
-        for subdir in base_path.rglob("*"):
-            if subdir.is_dir() and self.is_playwright_project(subdir):
-                print(f"✅ Playwright project found at: {subdir}")
-                return True
-        return False
+        """Search for any Playwright project in the base_path."""
+        project_dir = self.locate_playwright_project(base_path)
+        if project_dir is None:
+            return False
+        print(f"✅ Playwright project found at: {project_dir}")
+        self.write_project_marker(base_path, project_dir)
+        return True
+
+    def locate_playwright_project(self, base_path: Path):
+        """
+        Find a Playwright project in the base_path: first the location recorded in the marker file, then the
+        usual locations, then a walk limited to discovery_depth levels that skips node_modules, hidden folders
+        and test/report output.
+        :param base_path: The target folder.
+        :return: The project folder, or None.
+        """
+        marked = self.read_project_marker(base_path)
+        if marked is not None and self.is_playwright_project(marked):
+            return marked
+        for candidate in (base_path, base_path / "playwright"):
+            if candidate.is_dir() and self.is_playwright_project(candidate):
+                return candidate
+
+        level = [base_path]
+        for _ in range(self.discovery_depth):
+            next_level = []
+            for folder in level:
+                try:
+                    entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+                except OSError:
+                    continue
+                for entry in entries:
+                    if entry.name.startswith(".") or entry.name in DISCOVERY_SKIP_DIRS:
+                        continue
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    subdir = Path(entry.path)
+                    if self.is_playwright_project(subdir):
+                        return subdir
+                    next_level.append(subdir)
+            level = next_level
+        return None
+
+    def read_project_marker(self, base_path: Path):
+        """Return the project folder recorded in the marker file, or None."""
+        marker = base_path / STATE_DIR_NAME / PROJECT_MARKER
+        try:
+            with open(marker, "r", encoding="utf-8") as f:
+                return base_path / json.load(f)["project_dir"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def write_project_marker(self, base_path: Path, project_dir: Path):
+        """Record where the Playwright project lives, relative to the target folder."""
+        if self.read_project_marker(base_path) == project_dir:
+            return
+        marker = get_state_dir(base_path) / PROJECT_MARKER
+        data = {
+            "project_dir": os.path.relpath(project_dir, base_path),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        marker.write_text(json.dumps(data, indent=2), encoding="utf-8")
 
     def clean_playwright_project(self, project_dir: str):
         """
@@ -67,21 +147,52 @@ class PlaywrightProjectManager:
             print("ℹ️ Playwright already configured here.")
             return False
 
-        commands = [
-            "npm init playwright@latest -- --lang=js --quiet --install-deps",
-            "npm i -D allure-playwright dotenv allure-js-commons"
-        ]
-
-        for cmd in commands:
-            self.run_command(cmd, str(tests_dir))
+        if self.scaffold == "npm":
+            commands = [
+                "npm init playwright@latest -- --lang=js --quiet --install-deps",
+                "npm i -D allure-playwright dotenv allure-js-commons"
+            ]
+            for cmd in commands:
+                self.run_command(cmd, str(tests_dir))
+        else:
+            self.scaffold_from_template(tests_dir)
 
-            self.clean_playwright_project(tests_dir)
-            self.create_workflow_yml_file(tests_dir)
-            self.create_api_fixtures_file(tests_dir)
-            self.ensure_gitignore(tests_dir)
+        self.clean_playwright_project(tests_dir)
+        self.create_workflow_yml_file(tests_dir)
+        self.create_api_fixtures_file(tests_dir)
+        self.ensure_gitignore(tests_dir)
+        self.write_project_marker(self.base_path, tests_dir)
         print("✅ Playwright setup complete.")
         return True
 
+    def scaffold_from_template(self, project_dir: Path):
+        """
+        Write the version-pinned project template and install its dependencies without the network:
+        copy (hard-link where possible) a node_modules folder shipped in the template directory, else run
+        `npm ci --offline` when the template has a lockfile or `npm install --offline` from the local npm cache.
+        Only when the offline install fails are the packages downloaded.
+        """
+        print(f"📦 Scaffolding from template: {self.template_dir}")
+        shutil.copytree(self.template_dir, project_dir, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns("node_modules", "__pycache__"))
+        (project_dir / "tests").mkdir(exist_ok=True)
+
+        template_modules = self.template_dir / "node_modules"
+        if template_modules.is_dir():
+            shutil.copytree(template_modules, project_dir / "node_modules", symlinks=True, dirs_exist_ok=True,
+                            copy_function=link_or_copy)
+            print("✅ Dependencies copied from the template's node_modules.")
+            return
+
+        flags = "--no-audit --no-fund"
+        if (project_dir / "package-lock.json").exists():
+            offline = f"npm ci --offline {flags}"
+        else:
+            offline = f"npm install --offline {flags}"
+        if not self.run_command(offline, str(project_dir), exit_on_error=False):
+            print("⚠️ Offline install failed (packages not in the npm cache); downloading them instead.")
+            self.run_command(f"npm install --prefer-offline {flags}", str(project_dir))
+
     def setup(self):
         """Main method to set up Playwright project if none exists."""
         if not self.base_path.exists():
@@ -260,6 +371,7 @@ export const test = base.extend({
             ".DS_Store",
             "/allure-report/",
             "/allure-results/",
+            "/.restplaywright/cache/",
             ".env",
             ".env-*",
             ".venv",
@@ -290,3 +402,11 @@ export const test = base.extend({
                 return f"🔄 Updated existing .gitignore at {gitignore_path}"
             else:
                 return "👌 .gitignore already contains all required ignores"
+
+
+def link_or_copy(src, dst):
+    """Hard-link a file, falling back to a copy across file systems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
@@ -0,0 +1,269 @@
+import email.utils
+import os
+import random
+import re
+import threading
+import time
+import yaml
+
+RETRYABLE_STATUS_CODES = {408, 409, 500, 502, 503, 504}
+# Throttling as worded in provider messages; a bare "429" or "quota" would also match token counts and billing errors.
+RATE_LIMIT_PATTERN = re.compile(
+    r"\b429\b|rate[ _-]?limit|resource[ _]exhausted|too many requests", re.IGNORECASE)
+# Hard quota/billing errors: also sent as HTTP 429 (OpenAI's RateLimitError), but waiting never clears them.
+QUOTA_EXHAUSTED_MARKERS = ("insufficient_quota",)
+TRANSIENT_ERROR_NAMES = ("Timeout", "APIConnectionError", "ServiceUnavailable", "InternalServerError",
+                         "DeadlineExceeded", "ServerError")
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``."""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1):
+        """
+        Block until ``amount`` tokens are available, then take them.
+        :param amount: Tokens needed; requests larger than the bucket only wait for a full bucket.
+        :return: Seconds spent waiting.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, delta: float):
+        """Correct an earlier estimate once the real usage is known (may leave the bucket in debt)."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit that halves when the provider throttles and grows back by one after every
+    ``limit`` consecutive successes (AIMD), between ``minimum`` and ``maximum``.
+
+    The calls in flight when the provider starts throttling tend to fail together; the limit is halved at
+    most once per ``cooldown`` seconds, so one burst of failures counts as a single congestion signal.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, cooldown: float = 5.0):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = self.maximum
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = None
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        with self._condition:
+            self._successes += 1
+            if self.limit < self.maximum and self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            self._successes = 0
+            now = time.monotonic()
+            if self._last_decrease is not None and now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.limit = max(self.minimum, self.limit // 2)
+
+
+def status_code_of(error: Exception):
+    """Best-effort HTTP status code of a provider SDK exception."""
+    for candidate in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "code", "status"):
+            value = getattr(candidate, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+class QuotaExhaustedError(RuntimeError):
+    """Raised when the provider reports the account's quota or credit as used up; retrying cannot help."""
+
+
+def is_quota_exhausted_error(error: Exception) -> bool:
+    """True when the error is a billing/quota failure (e.g. OpenAI's insufficient_quota) rather than throttling."""
+    if isinstance(error, QuotaExhaustedError):
+        return True
+    body = getattr(error, "body", None)
+    codes = {getattr(error, "code", None), body.get("code") if isinstance(body, dict) else None}
+    if any(code in QUOTA_EXHAUSTED_MARKERS for code in codes):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in QUOTA_EXHAUSTED_MARKERS)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True when the error means the provider is throttling us (HTTP 429 / rate or per-minute quota)."""
+    if is_quota_exhausted_error(error):
+        return False
+    status = status_code_of(error)
+    if status is not None:
+        return status == 429
+    if type(error).__name__ in ("RateLimitError", "ResourceExhausted"):
+        return True
+    return RATE_LIMIT_PATTERN.search(str(error)) is not None
+
+
+def is_transient_error(error: Exception) -> bool:
+    """True for server-side or network errors that are worth retrying."""
+    if status_code_of(error) in RETRYABLE_STATUS_CODES:
+        return True
+    return any(name in type(error).__name__ for name in TRANSIENT_ERROR_NAMES)
+
+
+def retry_after_seconds(error: Exception):
+    """
+    Extract the server's requested delay from a Retry-After / retry-after-ms header, or from a Gemini style
+    "retry in 12.5s" / "retry_delay { seconds: 12 }" message.
+    :param error: The provider exception.
+    :return: Delay in seconds, or None.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        pass
+
+    match = re.search(r"retry (?:in|after) (\d+(?:\.\d+)?)\s*s", str(error), re.IGNORECASE)
+    if not match:
+        match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", str(error))
+    return float(match.group(1)) if match else None
+
+
+class RateLimiter:
+    """
+    Provider-aware throttling for LLM calls.
+
+    Every call takes one request from the requests-per-minute bucket and its estimated tokens from the
+    tokens-per-minute bucket, runs under the adaptive concurrency limit, and is retried with exponential
+    backoff (or the server's Retry-After) on throttling and transient errors.
+    """
+
+    def __init__(self, rpm: float = None, tpm: float = None, concurrency: int = 1, max_retries: int = 6,
+                 base_delay: float = 2.0, max_delay: float = 120.0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Set once the provider reports the quota as used up; later calls fail without being sent.
+        self.quota_error = None
+
+    @classmethod
+    def from_env(cls, model: str = None, concurrency: int = 1):
+        """
+        Build the limiter for a model. Limits come from LLM_RATE_LIMITS_FILE (a YAML/JSON mapping of model
+        name to {rpm, tpm}), overridden by LLM_RPM / LLM_TPM; LLM_MAX_RETRIES bounds the retries.
+        :param model: The configured model name.
+        :param concurrency: Upper bound of concurrent calls.
+        :return: A RateLimiter.
+        """
+        limits = {}
+        limits_file = os.getenv("LLM_RATE_LIMITS_FILE")
+        if limits_file:
+            with open(limits_file, "r", encoding="utf-8") as f:
+                limits = (yaml.safe_load(f) or {}).get(model, {}) or {}
+        rpm = os.getenv("LLM_RPM") or limits.get("rpm")
+        tpm = os.getenv("LLM_TPM") or limits.get("tpm")
+        return cls(
+            rpm=float(rpm) if rpm else None,
+            tpm=float(tpm) if tpm else None,
+            concurrency=concurrency,
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "6")),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn, estimated_tokens: int = 0, name: str = ""):
+        """
+        Run ``fn`` under the rate limits, retrying throttled and transient failures.
+        :param fn: Zero-argument callable making the LLM call.
+        :param estimated_tokens: Expected tokens of the call, charged to the tokens-per-minute bucket.
+        :param name: Label used in log messages.
+        :return: Whatever ``fn`` returns.
+        """
+        attempt = 0
+        while True:
+            if self.quota_error is not None:
+                raise QuotaExhaustedError(f"Not calling the LLM for {name}: {self.quota_error}")
+            if self.requests:
+                self.requests.acquire(1)
+            if self.tokens and estimated_tokens:
+                self.tokens.acquire(estimated_tokens)
+            self.concurrency.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                if is_quota_exhausted_error(e):
+                    self.quota_error = e
+                    print(f"❌ LLM quota exhausted, not retrying: {e}")
+                    raise QuotaExhaustedError(str(e)) from e
+                throttled = is_rate_limit_error(e)
+                if attempt >= self.max_retries or not (throttled or is_transient_error(e)):
+                    raise
+                if throttled:
+                    self.concurrency.on_throttle()
+                delay = retry_after_seconds(e) if throttled else None
+                if delay is None:
+                    delay = self.backoff(attempt)
+                reason = "Rate limited" if throttled else "Transient error"
+                print(f"⏳ {reason} for {name}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s "
+                      f"(concurrency now {self.concurrency.limit}): {e}")
+            else:
+                self.concurrency.on_success()
+                usage = getattr(result, "usage_metadata", None) or {}
+                if self.tokens and usage.get("total_tokens"):
+                    self.tokens.adjust(usage["total_tokens"] - estimated_tokens)
+                return result
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,106 @@
+import time
+from functools import cached_property
+from pathlib import Path
+from RestPlaywright.utils.spec_fingerprint import operation_input_fingerprints
+from RestPlaywright.utils.spec_loader import backend_names, load_spec_file
+from RestPlaywright.utils.spec_refs import HTTP_METHODS, RefGraph
+from RestPlaywright.utils.spec_resolver import SpecResolver
+
+VALID_EXTENSIONS = [".json", ".yaml", ".yml"]
+
+
+class SpecDocument:
+    """
+    An OpenAPI spec parsed once and shared by every pipeline stage.
+
+    The raw document is available as ``data``; commonly used views (paths, components, servers, the
+    reference graph, ...) are computed lazily on first access and cached.
+    """
+
+    def __init__(self, data: dict, path=None):
+        if not isinstance(data, dict):
+            raise ValueError(f"Swagger file {path} is empty or invalid.")
+        self.data = data
+        self.path = Path(path) if path else None
+
+    @classmethod
+    def load(cls, path):
+        """
+        Parse a Swagger/OpenAPI file (JSON or YAML).
+        :param path: The spec file path.
+        :return: A SpecDocument.
+        """
+        path = Path(path)
+        started = time.perf_counter()
+        data = load_spec_file(path)
+        print(f"📖 Loaded spec: {path.name} in {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"({backend_names()['json' if path.suffix.lower() == '.json' else 'yaml']})")
+        return cls(data, path)
+
+    @classmethod
+    def coerce(cls, spec):
+        """
+        Accept either an already loaded SpecDocument or a file path.
+        :param spec: A SpecDocument or a path to a spec file.
+        :return: A SpecDocument.
+        """
+        if isinstance(spec, cls):
+            return spec
+        return cls.load(spec)
+
+    @property
+    def name(self) -> str:
+        """File name of the spec, or a placeholder for in-memory documents."""
+        return self.path.name if self.path else "<in-memory spec>"
+
+    @property
+    def is_yaml(self) -> bool:
+        """True when the spec was loaded from a YAML file."""
+        return self.path is not None and self.path.suffix.lower() in [".yaml", ".yml"]
+
+    @cached_property
+    def info(self) -> dict:
+        return self.data.get("info", {}) or {}
+
+    @cached_property
+    def servers(self) -> list:
+        return self.data.get("servers", []) or []
+
+    @cached_property
+    def paths(self) -> dict:
+        return self.data.get("paths", {}) or {}
+
+    @cached_property
+    def components(self) -> dict:
+        return self.data.get("components", {}) or {}
+
+    @cached_property
+    def security_schemes(self) -> dict:
+        return self.components.get("securitySchemes", {}) or {}
+
+    @cached_property
+    def ref_graph(self) -> RefGraph:
+        return RefGraph(self.data)
+
+    @cached_property
+    def resolver(self) -> SpecResolver:
+        return SpecResolver.from_env(self.data, self.ref_graph)
+
+    def operations(self):
+        """
+        Iterate over every operation in the spec, skipping path-level keys such as "parameters".
+        :return: A generator of (path, method, operation) tuples.
+        """
+        for path, path_item in self.paths.items():
+            for method, operation in path_item.items():
+                if method.lower() in HTTP_METHODS:
+                    yield path, method, operation
+
+    @cached_property
+    def operation_count(self) -> int:
+        return sum(1 for _ in self.operations())
+
+    @cached_property
+    def input_fingerprints(self) -> dict:
+        """Fingerprint of everything each operation's generation depends on, keyed by (path, method)."""
+        return operation_input_fingerprints(self.data, self.ref_graph)
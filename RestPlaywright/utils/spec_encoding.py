@@ -0,0 +1,197 @@
+import json
+import os
+import sys
+import yaml
+from RestPlaywright.utils.operation_splitter import estimate_tokens
+
+# json: indented JSON (the historical prompt format); json-min: JSON without whitespace; yaml: block-style YAML;
+# condensed: YAML without descriptions/vendor extensions and with shorthand notation for simple schemas.
+ENCODINGS = ("json", "json-min", "yaml", "condensed")
+DEFAULT_ENCODING = "json"
+
+# Documentation-only keys dropped by the condensed encoding (as are all "x-" vendor extensions).
+DOC_KEYS = {"description", "externalDocs"}
+# Maps whose keys are user-chosen names (a property may well be called "description"), never dropped.
+NAME_MAPS = {"paths", "properties", "patternProperties", "responses", "schemas", "parameters", "requestBodies",
+             "headers", "securitySchemes", "examples", "links", "callbacks", "content", "encoding", "variables",
+             "scopes", "mapping", "definitions", "securityDefinitions"}
+# Literal data that is copied verbatim, as is a list-valued "examples" (JSON Schema) and the "value" of an
+# Example Object: a payload may well contain "description" or "x-" keys of its own.
+LITERAL_KEYS = {"example", "default", "enum", "const"}
+# Keys whose values (or list items) are schemas, where the shorthand notation applies.
+SCHEMA_KEYS = {"schema", "items", "additionalProperties", "not"}
+SCHEMA_LIST_KEYS = {"allOf", "oneOf", "anyOf"}
+SCHEMA_MAPS = {"properties", "patternProperties", "schemas", "definitions"}
+
+CONDENSED_NOTE = (
+    "The spec below is condensed: descriptions and x- extensions are removed, a schema written as "
+    "`type<format>` is {type, format} and `array<item>` is an array of that item schema."
+)
+
+
+class _NoAliasDumper(yaml.SafeDumper):
+    """Safe YAML dumper that repeats shared objects instead of emitting anchors and aliases."""
+
+    def ignore_aliases(self, data):
+        return True
+
+
+def get_spec_encoding(encoding: str = None) -> str:
+    """
+    Resolve the spec encoding to use in prompts.
+    :param encoding: An explicit encoding name, or None for LLM_SPEC_ENCODING.
+    :return: One of ENCODINGS.
+    """
+    encoding = (encoding or os.getenv("LLM_SPEC_ENCODING", DEFAULT_ENCODING)).strip().lower()
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown LLM_SPEC_ENCODING '{encoding}', expected one of {', '.join(ENCODINGS)}")
+    return encoding
+
+
+def shorthand_schema(schema):
+    """
+    Collapse a schema that only states a type (and format, or array item type) into a string.
+    :param schema: A condensed schema.
+    :return: "type", "type<format>" or "array<item>", or the schema itself if it says more than that.
+    """
+    if not isinstance(schema, dict) or not isinstance(schema.get("type"), str):
+        return schema
+    keys = set(schema)
+    if keys == {"type"}:
+        return schema["type"]
+    if keys == {"type", "format"} and isinstance(schema["format"], str):
+        return f"{schema['type']}<{schema['format']}>"
+    if keys == {"type", "items"} and schema["type"] == "array" and isinstance(schema["items"], str):
+        return f"array<{schema['items']}>"
+    return schema
+
+
+def condense(obj, parent: str = None):
+    """
+    Drop documentation and vendor extensions and shorten simple schemas.
+    :param obj: A spec fragment.
+    :param parent: The key under which ``obj`` appears.
+    :return: The condensed fragment (a new object; the input is not modified).
+    """
+    if isinstance(obj, list):
+        items = [condense(item) for item in obj]
+        if parent in SCHEMA_LIST_KEYS:
+            items = [shorthand_schema(item) for item in items]
+        return items
+    if not isinstance(obj, dict):
+        return obj
+
+    names = parent in NAME_MAPS
+    condensed = {}
+    for key, value in obj.items():
+        if not names and (key in DOC_KEYS or str(key).startswith("x-")):
+            continue
+        if not names and (key in LITERAL_KEYS or (key == "examples" and isinstance(value, list))):
+            condensed[key] = value
+            continue
+        if parent == "examples" and isinstance(value, dict):
+            condensed[key] = condense_example(value)
+            continue
+        # Entries of a name map are named objects, not keywords: pass no parent key down for them.
+        value = condense(value, None if names else key)
+        if (not names and key in SCHEMA_KEYS) or parent in SCHEMA_MAPS:
+            value = shorthand_schema(value)
+        condensed[key] = value
+    return condensed
+
+
+def condense_example(example: dict) -> dict:
+    """
+    Condense an Example Object, keeping its ``value`` verbatim.
+    :param example: An entry of an "examples" map.
+    :return: The example without documentation keys.
+    """
+    return {key: value for key, value in example.items()
+            if key not in DOC_KEYS and not str(key).startswith("x-")}
+
+
+def encode_spec(spec: dict, encoding: str = None) -> str:
+    """
+    Serialise a (mini-)spec for a prompt.
+    :param spec: The spec as a plain dict.
+    :param encoding: One of ENCODINGS; defaults to LLM_SPEC_ENCODING.
+    :return: The encoded spec.
+    """
+    encoding = get_spec_encoding(encoding)
+    if encoding == "json":
+        return json.dumps(spec, indent=2)
+    if encoding == "json-min":
+        return json.dumps(spec, separators=(",", ":"), ensure_ascii=False)
+    if encoding == "condensed":
+        spec = condense(spec)
+    return yaml.dump(spec, Dumper=_NoAliasDumper, sort_keys=False, allow_unicode=True, width=1000).rstrip()
+
+
+def build_operation_prompt(spec: dict, filename: str, encoding: str = None) -> str:
+    """
+    Build the user prompt for one operation, as sent to the LLM.
+    :param spec: The operation's mini-spec, with its $refs resolved.
+    :param filename: The name of the OpenAPI spec file.
+    :param encoding: One of ENCODINGS; defaults to LLM_SPEC_ENCODING.
+    :return: The prompt.
+    """
+    encoding = get_spec_encoding(encoding)
+    # Only pass filename + spec as input
+    if encoding == "json":
+        return f"""
+            OpenAPI file: **{filename}**
+
+            Spec:
+            {json.dumps(spec, indent=2)}
+
+            Generate the Playwright .spec.js file.
+            """
+    note = f"{CONDENSED_NOTE}\n" if encoding == "condensed" else ""
+    return (f"OpenAPI file: **{filename}**\n\n{note}Spec ({encoding}):\n"
+            f"{encode_spec(spec, encoding)}\n\nGenerate the Playwright .spec.js file.\n")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken's o200k_base encoding when it is available, else estimate them.
+    :param text: The text to measure.
+    :return: Number of tokens.
+    """
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    except Exception:
+        return estimate_tokens(text)
+
+
+def encoding_report(spec) -> dict:
+    """
+    Measure every encoding on the user prompts of a spec's operations, built as in generation: from the
+    per-operation mini-specs with their $refs resolved (within LLM_REF_MAX_DEPTH / LLM_REF_MAX_RECURSION).
+    :param spec: A SpecDocument or spec file path.
+    :return: encoding -> total prompt tokens over all operations.
+    """
+    from RestPlaywright.utils.spec_document import SpecDocument
+    from RestPlaywright.utils.swagger_extractor import PathMethodExtractor
+
+    spec = SpecDocument.coerce(spec)
+    totals = dict.fromkeys(ENCODINGS, 0)
+    for operation in PathMethodExtractor(spec, save_to_disk=False).iter_operations():
+        resolved = operation.resolver.resolve(operation.spec)
+        for encoding in ENCODINGS:
+            totals[encoding] += count_tokens(build_operation_prompt(resolved, operation.name, encoding))
+    return totals
+
+
+def main(argv=None):
+    """Print the prompt token count of every encoding for the spec files given on the command line."""
+    for path in (argv if argv is not None else sys.argv[1:]):
+        totals = encoding_report(path)
+        baseline = totals[DEFAULT_ENCODING] or 1
+        print(f"📏 {path}")
+        for encoding, tokens in totals.items():
+            print(f"   {encoding:<10} {tokens:>9} tokens ({tokens / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+from RestPlaywright.utils.spec_refs import HTTP_METHODS, RefGraph, component_ref
+
+
+def canonicalize(obj):
+    """
+    Convert a spec fragment to a canonical form: dict keys sorted and list items ordered by their own
+    canonical JSON, so two fragments that only differ in ordering compare equal (like DeepDiff's
+    ignore_order=True).
+    :param obj: A JSON-like value.
+    :return: The canonical value.
+    """
+    if isinstance(obj, dict):
+        return {str(k): canonicalize(v) for k, v in sorted(obj.items(), key=lambda item: str(item[0]))}
+    if isinstance(obj, (list, tuple)):
+        items = [canonicalize(i) for i in obj]
+        return sorted(items, key=lambda i: json.dumps(i, sort_keys=True, default=str))
+    return obj
+
+
+def canonical_json(obj) -> str:
+    """Serialise a spec fragment to compact canonical JSON."""
+    return json.dumps(canonicalize(obj), sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def fingerprint(obj) -> str:
+    """
+    Stable content hash of a spec fragment.
+    :param obj: A JSON-like value.
+    :return: A hex sha256 digest of its canonical JSON.
+    """
+    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+
+
+def operation_fingerprints(spec: dict) -> dict:
+    """
+    Fingerprint every operation of a spec. Path-level parameters are part of each operation's fingerprint
+    since they apply to every method under the path.
+    :param spec: The OpenAPI spec as a dict.
+    :return: A dict mapping (path, method) to the operation's fingerprint.
+    """
+    fingerprints = {}
+    for path, path_item in (spec.get("paths", {}) or {}).items():
+        shared = path_item.get("parameters")
+        for method, operation in path_item.items():
+            if method.lower() not in HTTP_METHODS:
+                continue
+            fingerprints[(path, method)] = fingerprint({"parameters": shared, "operation": operation})
+    return fingerprints
+
+
+def component_fingerprints(spec: dict) -> dict:
+    """
+    Fingerprint every component of a spec.
+    :param spec: The OpenAPI spec as a dict.
+    :return: A dict mapping component references ("#/components/schemas/Pet") to fingerprints.
+    """
+    fingerprints = {}
+    for section, items in (spec.get("components", {}) or {}).items():
+        if not isinstance(items, dict):
+            continue
+        for name, value in items.items():
+            fingerprints[component_ref(section, name)] = fingerprint(value)
+    return fingerprints
+
+
+def operation_input_fingerprints(spec: dict, ref_graph: RefGraph = None) -> dict:
+    """
+    Fingerprint everything that goes into generating each operation's test: the operation itself, its
+    path-level parameters, the effective security requirements and every component it reaches (including
+    the security schemes). A change to any of them changes the fingerprint.
+    :param spec: The OpenAPI spec as a dict.
+    :param ref_graph: Reference graph of the spec, if already built.
+    :return: A dict mapping (path, method) to the operation's input fingerprint.
+    """
+    ref_graph = ref_graph or RefGraph(spec)
+    components = component_fingerprints(spec)
+    fingerprints = {}
+    for (path, method), operation_fp in operation_fingerprints(spec).items():
+        path_item = spec["paths"][path]
+        operation = path_item[method]
+        security = ref_graph.security_requirements(operation)
+        refs = ref_graph.reachable(path_item.get("parameters") or []) | ref_graph.reachable(operation)
+        refs |= {component_ref("securitySchemes", scheme) for requirement in security for scheme in requirement or {}}
+        fingerprints[(path, method)] = fingerprint({
+            "operation": operation_fp,
+            "security": security,
+            "components": {ref: components.get(ref) for ref in refs},
+        })
+    return fingerprints
@@ -0,0 +1,67 @@
+import json
+import yaml
+from pathlib import Path
+
+# libyaml's C loader when PyYAML was built with it, else the pure-Python one; both accept the same documents.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install "playwright-Api-codegen[fast]"
+    orjson = None
+
+JSON_EXTENSIONS = (".json",)
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
+def backend_names() -> dict:
+    """
+    Name the parsers in use.
+    :return: A dict with the "json" and "yaml" backend names.
+    """
+    return {
+        "json": "orjson" if orjson is not None else "json",
+        "yaml": "libyaml" if YAML_LOADER is not yaml.SafeLoader else "pure-python",
+    }
+
+
+def parse_json(data: bytes):
+    """
+    Parse JSON with orjson when it is installed, else with the standard library.
+    Documents orjson rejects but json accepts (NaN, integers beyond 64 bits) still load through json.
+    :param data: The JSON document as bytes or str.
+    :return: The parsed object.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    return json.loads(data)
+
+
+def parse_yaml(data: bytes):
+    """
+    Parse YAML with the safe loader, using libyaml when available.
+    :param data: The YAML document as bytes or str.
+    :return: The parsed object.
+    """
+    return yaml.load(data, Loader=YAML_LOADER)
+
+
+def load_spec_file(path):
+    """
+    Parse a Swagger/OpenAPI file (JSON or YAML) with the fastest available backend.
+    :param path: The spec file path.
+    :return: The parsed spec.
+    """
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext not in JSON_EXTENSIONS + YAML_EXTENSIONS:
+        raise ValueError("Swagger file must be .json or .yaml/.yml")
+    data = path.read_bytes()
+    if ext in JSON_EXTENSIONS:
+        return parse_json(data)
+    return parse_yaml(data)
@@ -0,0 +1,174 @@
+COMPONENT_REF_PREFIX = "#/components/"
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+def collect_refs(node) -> set:
+    """
+    Collect every local "$ref" target found anywhere inside a spec node.
+    :param node: A dict/list fragment of the OpenAPI spec.
+    :return: A set of reference strings such as "#/components/schemas/Pet".
+    """
+    refs = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str):
+                refs.add(ref)
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
+
+
+def split_component_ref(ref: str):
+    """
+    Split a local component reference into its section and name.
+    "#/components/schemas/Pet/properties/id" -> ("schemas", "Pet")
+    :param ref: The reference string.
+    :return: A (section, name) tuple, or None for external or non-component references.
+    """
+    if not ref.startswith(COMPONENT_REF_PREFIX):
+        return None
+    parts = ref[len(COMPONENT_REF_PREFIX):].split("/")
+    if len(parts) < 2:
+        return None
+    name = parts[1].replace("~1", "/").replace("~0", "~")
+    return parts[0], name
+
+
+def component_ref(section: str, name: str) -> str:
+    """Build the canonical reference string for a component."""
+    return f"{COMPONENT_REF_PREFIX}{section}/{name.replace('~', '~0').replace('/', '~1')}"
+
+
+class RefGraph:
+    """
+    Reference graph of an OpenAPI spec's components, built once per spec.
+
+    Nodes are components ("#/components/<section>/<name>"), edges are the $refs a component uses.
+    The transitive closure of each component is computed on demand and memoized, so the set of components
+    reachable from an operation costs one union of cached closures. The reverse index maps each component
+    to the operations that reach it, directly or through other components.
+    """
+
+    def __init__(self, spec: dict):
+        self.spec = spec
+        self.components = spec.get("components", {}) or {}
+        self.edges = {}
+        for section, items in self.components.items():
+            if not isinstance(items, dict):
+                continue
+            for name, value in items.items():
+                self.edges[component_ref(section, name)] = self._component_refs(value)
+        self._closures = {}
+        self._dependents = None
+
+    def _component_refs(self, node) -> set:
+        """Direct component references of a spec node, normalised to component level."""
+        refs = set()
+        for ref in collect_refs(node):
+            parts = split_component_ref(ref)
+            if parts:
+                refs.add(component_ref(*parts))
+        return refs
+
+    def closure(self, ref: str) -> set:
+        """
+        Return every component reachable from the given component, including itself.
+        :param ref: A component reference.
+        :return: A set of component references.
+        """
+        cached = self._closures.get(ref)
+        if cached is not None:
+            return cached
+
+        seen = {ref}
+        stack = [ref]
+        while stack:
+            current = stack.pop()
+            known = self._closures.get(current)
+            if known is not None and current != ref:
+                seen |= known
+                continue
+            for target in self.edges.get(current, ()):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        self._closures[ref] = frozenset(seen)
+        return self._closures[ref]
+
+    def reachable(self, node) -> set:
+        """
+        Return every component reachable from an arbitrary spec node (an operation, a path item, ...).
+        :param node: A dict/list fragment of the spec.
+        :return: A set of component references.
+        """
+        reachable = set()
+        for ref in self._component_refs(node):
+            reachable |= self.closure(ref)
+        return reachable
+
+    def dependents(self) -> dict:
+        """
+        Reverse dependency index, built once: component reference -> set of (path, method) operations
+        that reach it. Path-level parameters count towards every operation under the path.
+        :return: A dict of component reference to a set of operation keys.
+        """
+        if self._dependents is not None:
+            return self._dependents
+
+        dependents = {}
+        for path, path_item in (self.spec.get("paths", {}) or {}).items():
+            shared = self.reachable(path_item.get("parameters") or [])
+            for method, operation in path_item.items():
+                if method.lower() not in HTTP_METHODS:
+                    continue
+                for ref in shared | self.reachable(operation):
+                    dependents.setdefault(ref, set()).add((path, method))
+        self._dependents = dependents
+        return dependents
+
+    def dependent_operations(self, refs) -> set:
+        """
+        Return the operations affected by a change to any of the given components.
+        :param refs: Component references (e.g. "#/components/schemas/Pet").
+        :return: A set of (path, method) tuples.
+        """
+        dependents = self.dependents()
+        affected = set()
+        for ref in refs:
+            affected |= dependents.get(ref, set())
+        return affected
+
+    def security_requirements(self, operation: dict) -> list:
+        """
+        Return the security requirements that apply to an operation (its own, or the spec-wide default).
+        :param operation: The operation object.
+        :return: A list of security requirement objects.
+        """
+        if "security" in operation:
+            return operation.get("security") or []
+        return self.spec.get("security", []) or []
+
+    def prune_components(self, refs, security: list = None) -> dict:
+        """
+        Build a components section containing only the given components and the security schemes used.
+        :param refs: Component references to keep.
+        :param security: Security requirement objects whose schemes should be kept.
+        :return: A components dict with the original section and key order.
+        """
+        keep = set(refs)
+        for requirement in security or []:
+            for scheme in requirement or {}:
+                keep.add(component_ref("securitySchemes", scheme))
+
+        pruned = {}
+        for section, items in self.components.items():
+            if not isinstance(items, dict):
+                continue
+            subset = {name: value for name, value in items.items() if component_ref(section, name) in keep}
+            if subset:
+                pruned[section] = subset
+        return pruned
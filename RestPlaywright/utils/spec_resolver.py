@@ -0,0 +1,182 @@
+import os
+from urllib.parse import unquote
+from RestPlaywright.utils.spec_refs import RefGraph, component_ref, split_component_ref
+
+
+def resolve_pointer(document, ref: str):
+    """
+    Follow a local JSON pointer reference ("#/components/schemas/Pet") inside a document.
+    :param document: The document the reference points into.
+    :param ref: The reference string.
+    :return: The target node, or None when the reference is external or does not exist.
+    """
+    if not ref.startswith("#"):
+        return None
+    node = document
+    for part in ref[1:].split("/")[1:]:
+        part = unquote(part).replace("~1", "/").replace("~0", "~")
+        if isinstance(node, list):
+            try:
+                node = node[int(part)]
+            except (ValueError, IndexError):
+                return None
+        elif isinstance(node, dict) and part in node:
+            node = node[part]
+        else:
+            return None
+    return node
+
+
+class SpecResolver:
+    """
+    Resolves local $refs of one spec, dereferencing every referenced node only once.
+
+    Resolved targets are memoized per reference and shared by every operation that uses them, so they must
+    be treated as read-only. Containers without references below them are returned as they are; only the
+    containers along the way to a reference are rebuilt. A "$ref" with sibling keys resolves to the target
+    merged with those keys.
+
+    Inlining is bounded: a reference already being expanded ``max_recursion`` times further up (a recursive
+    schema such as a tree, or Category.parent: Category), or one nested more than ``max_depth`` references
+    deep, is left as a compact {"$ref": ...} back-reference instead of being expanded again. The mini-spec's
+    components section still holds its definition.
+
+    A value cut short that way depends on how deep it was reached, and for a reference on a cycle also on
+    the references being expanded above it. Values of references outside any cycle are therefore memoized
+    per remaining depth, while cut values of recursive references are re-resolved (to a bounded size) per
+    use. Either way the result depends only on the node resolved, never on what was resolved before, and
+    the memo is only ever filled with complete values, so one resolver can be shared between threads.
+    """
+
+    def __init__(self, spec: dict, max_depth: int = 10, max_recursion: int = 1, ref_graph: RefGraph = None):
+        self.spec = spec
+        self.max_depth = max_depth
+        self.max_recursion = max(1, max_recursion)
+        self.ref_graph = ref_graph
+        # ref -> (resolved value, number of nested references inlined in it).
+        self._resolved = {}
+        # (ref, remaining depth) -> (value cut short by the depth limit, nesting) for references on no cycle.
+        self._truncated = {}
+        self._acyclic = {}
+        # id of a component -> (component, its reference): a mini-spec's components section holds the very same
+        # objects, which resolve exactly as (and from the same memo as) a $ref to them.
+        self._components = {}
+        for section, items in (spec.get("components") or {}).items():
+            for name, item in (items or {}).items():
+                if isinstance(item, dict):
+                    self._components[id(item)] = (item, component_ref(section, name))
+
+    @classmethod
+    def from_env(cls, spec: dict, ref_graph: RefGraph = None):
+        """Build a resolver limited by LLM_REF_MAX_DEPTH / LLM_REF_MAX_RECURSION."""
+        return cls(
+            spec,
+            max_depth=int(os.getenv("LLM_REF_MAX_DEPTH", "10")),
+            max_recursion=int(os.getenv("LLM_REF_MAX_RECURSION", "1")),
+            ref_graph=ref_graph,
+        )
+
+    def is_acyclic(self, ref: str) -> bool:
+        """
+        Whether nothing reachable from a component reference leads back to it.
+        :param ref: A reference string.
+        :return: True for component references on no cycle, False otherwise (also for other references).
+        """
+        known = self._acyclic.get(ref)
+        if known is not None:
+            return known
+        parts = split_component_ref(ref)
+        acyclic = False
+        if parts:
+            if self.ref_graph is None:
+                self.ref_graph = RefGraph(self.spec)
+            component = component_ref(*parts)
+            acyclic = not any(component in self.ref_graph.closure(target)
+                              for target in self.ref_graph.edges.get(component, ()))
+        self._acyclic[ref] = acyclic
+        return acyclic
+
+    def resolve(self, node):
+        """
+        Resolve every local $ref inside a node of this spec (or of a mini-spec cut from it).
+        :param node: A dict/list fragment.
+        :return: The resolved fragment, sharing resolved subtrees with other results.
+        """
+        value, _ = self._resolve(node, [])
+        return value
+
+    def _resolve(self, node, stack):
+        """
+        :param stack: References currently being expanded, outermost first.
+        :return: A (value, (height, cut)) tuple: height is the deepest nesting of references inlined in the
+            value, cut tells whether a back-reference was left in it.
+        """
+        if isinstance(node, list):
+            return self._resolve_items(node, enumerate(node), stack)
+        if not isinstance(node, dict):
+            return node, (0, False)
+        component = self._components.get(id(node))
+        if component is not None and component[0] is node:
+            return self._resolve_ref(component[1], stack)
+        return self._resolve_dict(node, stack)
+
+    def _resolve_items(self, node, items, stack):
+        """Resolve the values of a list or dict, rebuilding it only if one of them changed."""
+        resolved = [] if isinstance(node, list) else {}
+        height, cut, changed = 0, False, False
+        for key, item in items:
+            value, (item_height, item_cut) = self._resolve(item, stack)
+            if isinstance(resolved, list):
+                resolved.append(value)
+            else:
+                resolved[key] = value
+            changed = changed or value is not item
+            height, cut = max(height, item_height), cut or item_cut
+        return (resolved if changed else node), (height, cut)
+
+    def _resolve_dict(self, node: dict, stack):
+        """Resolve a dict that is not itself a component: follow its $ref or resolve its values."""
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            target = self._resolve_ref(ref, stack)
+            if target is not None:
+                value, (height, cut) = target
+                if len(node) == 1 or not isinstance(value, dict):
+                    return value, (height, cut)
+                siblings, (siblings_height, siblings_cut) = self._resolve(
+                    {k: v for k, v in node.items() if k != "$ref"}, stack)
+                return {**value, **siblings}, (max(height, siblings_height), cut or siblings_cut)
+        return self._resolve_items(node, node.items(), stack)
+
+    def _resolve_ref(self, ref: str, stack):
+        """
+        Expand one reference, from the memo when possible, or leave a back-reference past the limits.
+        :return: A (value, (height, cut)) tuple, or None when the reference cannot be followed.
+        """
+        remaining = self.max_depth - len(stack)
+        memo = self._resolved.get(ref)
+        if memo is not None and memo[1] <= remaining:
+            return memo[0], (memo[1], False)
+        memo = self._truncated.get((ref, remaining))
+        if memo is not None:
+            return memo[0], (memo[1], True)
+        if remaining <= 0 or stack.count(ref) >= self.max_recursion:
+            return {"$ref": ref}, (0, True)
+        target = resolve_pointer(self.spec, ref)
+        if target is None:
+            return None
+
+        stack.append(ref)
+        try:
+            if isinstance(target, dict):
+                value, (height, cut) = self._resolve_dict(target, stack)
+            else:
+                value, (height, cut) = self._resolve(target, stack)
+        finally:
+            stack.pop()
+        height += 1
+        if not cut:
+            self._resolved[ref] = (value, height)
+        elif self.is_acyclic(ref):
+            self._truncated[(ref, remaining)] = (value, height)
+        return value, (height, cut)
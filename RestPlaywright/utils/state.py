@@ -0,0 +1,25 @@
+import os
+from pathlib import Path
+
+# Folder inside the generated Playwright project that holds the tool's own bookkeeping.
+STATE_DIR_NAME = ".restplaywright"
+
+
+def get_state_dir(target_folder) -> Path:
+    """
+    Return the tool's state directory inside the target Playwright project, creating it if needed.
+    :param target_folder: The generated Playwright project folder.
+    :return: Path of the state directory.
+    """
+    state_dir = Path(target_folder) / STATE_DIR_NAME
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir
+
+
+def get_user_cache_dir() -> Path:
+    """
+    Return the per-user cache directory shared by all target projects.
+    :return: Path of the user cache directory (not created).
+    """
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "restplaywright"
@@ -1,25 +1,87 @@
 import sys
-import json
-import yaml
 from pathlib import Path
-from openapi_spec_validator import validate
-from openapi_spec_validator.validation.exceptions import OpenAPIValidationError
+from RestPlaywright.utils.spec_document import SpecDocument, VALID_EXTENSIONS
+from RestPlaywright.utils.spec_refs import HTTP_METHODS
+from RestPlaywright.utils.validation_cache import ValidationCache, spec_content_hash
 
 
 class OpenAPISpecValidator:
-    VALID_EXTENSIONS = ['.json', '.yaml', '.yml']
+    VALID_EXTENSIONS = VALID_EXTENSIONS
 
-    def __init__(self, swagger_file: str):
-        self.swagger_file = swagger_file
+    def __init__(self, spec: SpecDocument, target_folder: str = None):
+        self.document = SpecDocument.coerce(spec)
         self.spec = None
+        # Without a target folder every run validates the whole spec.
+        self.cache = ValidationCache.from_env(target_folder) if target_folder else None
 
     def run_validation(self):
         """Main method to run the validation process."""
-        path = Path(self.swagger_file)
-        self._check_file(path)
-        self.spec = self._load_spec(path)
+        if self.document.path is not None:
+            self._check_file(self.document.path)
+        self.spec = self.document.data
         self._check_openapi_version(self.spec)
-        self._validate_spec(self.spec)
+        if self.cache is None:
+            self._validate_spec(self.spec)
+            return
+
+        content_hash = spec_content_hash(self.document)
+        if self.cache.is_validated(content_hash):
+            print("✅ OpenAPI spec unchanged since its last successful validation — skipped.")
+            return
+        changes = self.cache.changes(self.document)
+        if changes is None:
+            self._validate_spec(self.spec)
+        else:
+            self._validate_changes(*changes)
+        self.cache.record(self.document, content_hash)
+
+    def _validate_changes(self, operations, components):
+        """
+        Validate only what changed since the last validated spec: the changed operations (their input
+        fingerprints cover every component they reach) and changed components, with everything they reference.
+        Checks spanning all operations, such as unique operationIds, are run on the whole spec.
+        """
+        self._check_unique_operation_ids()
+        if not operations and not components:
+            print("✅ No operations or components changed since the last validation.")
+            return
+
+        document = self.document
+        ref_graph = document.ref_graph
+        paths = {}
+        refs = set()
+        for path, method in operations:
+            path_item = document.paths[path]
+            if path not in paths:
+                paths[path] = {key: value for key, value in path_item.items() if key.lower() not in HTTP_METHODS}
+            paths[path][method] = path_item[method]
+            refs |= ref_graph.reachable(path_item.get("parameters") or []) | ref_graph.reachable(path_item[method])
+        for ref in components:
+            refs |= ref_graph.closure(ref)
+
+        partial = {key: value for key, value in self.spec.items() if key not in ("paths", "components")}
+        partial["paths"] = paths
+        partial_components = ref_graph.prune_components(refs)
+        # Security requirements may name any scheme, so all of them are kept.
+        if document.security_schemes:
+            partial_components["securitySchemes"] = document.security_schemes
+        if partial_components:
+            partial["components"] = partial_components
+        print(f"🔍 Validating {len(operations)} changed operations and {len(components)} changed components")
+        self._validate_spec(partial)
+
+    def _check_unique_operation_ids(self):
+        """Exit if two operations share an operationId."""
+        seen = {}
+        for path, method, operation in self.document.operations():
+            operation_id = operation.get("operationId")
+            if operation_id is None:
+                continue
+            if operation_id in seen:
+                print(f"❌ OpenAPI spec is invalid: operationId '{operation_id}' is used by both "
+                      f"{seen[operation_id]} and {method.upper()} {path}")
+                sys.exit(1)
+            seen[operation_id] = f"{method.upper()} {path}"
 
     def _check_file(self, path: Path):
         """Check if the file exists and has a valid extension."""
@@ -33,14 +95,6 @@ class OpenAPISpecValidator:
 
         print(f"📄 File detected: {path.name}")
 
-    def _load_spec(self, file_path: Path):
-        """Load the OpenAPI spec from JSON or YAML file."""
-        with file_path.open('r', encoding='utf-8') as f:
-            if file_path.suffix == '.json':
-                return json.load(f)
-            else:
-                return yaml.safe_load(f)
-
     def _check_openapi_version(self, spec: dict):
         """Check if the OpenAPI version is 3.x or higher."""
         version = spec.get("openapi")
@@ -57,6 +111,10 @@ class OpenAPISpecValidator:
 
     def _validate_spec(self, spec: dict):
         """Validate the OpenAPI spec using openapi-spec-validator."""
+        # Imported here: openapi-spec-validator pulls in jsonschema and friends, which is slow at startup.
+        from openapi_spec_validator import validate
+        from openapi_spec_validator.validation.exceptions import OpenAPIValidationError
+
         try:
             validate(spec)
             print("✅ OpenAPI 3.x spec is valid.")
@@ -1,28 +1,67 @@
 import json
 import os
 import tempfile
-import yaml
 from pathlib import Path
 from datetime import datetime
+from RestPlaywright.utils.spec_document import SpecDocument
+
+
+def build_mini_spec(spec: SpecDocument, path: str, method: str, operation: dict) -> dict:
+    """
+    Build the mini OpenAPI spec for one operation.
+    Only the components the operation reaches through $refs, and the security schemes it uses, are kept.
+    """
+    ref_graph = spec.ref_graph
+    security = ref_graph.security_requirements(operation)
+    path_item = {method: operation}
+    # Path-level parameters apply to every operation under the path.
+    path_parameters = spec.paths[path].get("parameters")
+    if path_parameters:
+        path_item = {"parameters": path_parameters, **path_item}
+    mini_spec = {
+        "paths": {
+            path: path_item
+        },
+        "components": ref_graph.prune_components(ref_graph.reachable(path_item), security)
+    }
+    if "security" not in operation and security:
+        mini_spec["security"] = security
+    return mini_spec
+
+
+class ExtractedOperation:
+    """
+    One operation's mini-spec, kept in memory and handed straight to generation.
+
+    ``name`` and ``stem`` mirror the file an operation used to be written to, so generation, logging and
+    the manifest name things exactly as before. ``resolver`` is the resolver of the full spec, shared by all
+    operations so each component is dereferenced once.
+    """
+
+    def __init__(self, stem: str, path: str, method: str, fingerprint: str, spec: dict, resolver=None):
+        self.stem = stem
+        self.name = f"{stem}.json"
+        self.path = path
+        self.method = method
+        self.fingerprint = fingerprint
+        self.spec = spec
+        self.resolver = resolver
+
+    def __repr__(self):
+        return f"ExtractedOperation({self.name})"
 
 
 class PathMethodExtractor:
-    def __init__(self, swagger_path: str):
-        self.swagger_path = Path(swagger_path)
+    def __init__(self, spec: SpecDocument, save_to_disk: bool = None):
+        self.spec = SpecDocument.coerce(spec)
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.output_dir = Path(tempfile.gettempdir()) / f"restapi{timestamp}"
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-
-    def to_plain_obj(self, obj):
-        """
-        Recursively convert jsonref objects to plain dicts/lists.
-        :param obj:  The object to convert.
-        :return: A plain dict or list."""
-        if isinstance(obj, dict):
-            return {k: self.to_plain_obj(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self.to_plain_obj(i) for i in obj]
-        return obj
+        # Debug aid: also dump every mini-spec that is generated from into output_dir.
+        if save_to_disk is None:
+            save_to_disk = os.getenv("SAVE_EXTRACTED_SPECS", "false").lower() == "true"
+        self.save_to_disk = save_to_disk
+        # Extracted file stem -> {"path", "method", "fingerprint"} of the operation it holds.
+        self.extracted = {}
 
     def sanitize_filename(self, path: str, method: str):
         """Sanitize the path and method to create a valid filename."""
@@ -30,57 +69,61 @@ class PathMethodExtractor:
         filename_prefix = clean_path if clean_path else "root"
         return f"{filename_prefix}_{method.upper()}"
 
-    def load_spec(self):
-        """Load the OpenAPI spec from JSON or YAML file."""
-        with open(self.swagger_path, "r", encoding="utf-8") as f:
-            if self.swagger_path.suffix in [".yaml", ".yml"]:
-                return yaml.safe_load(f)
-            else:
-                return json.load(f)
-
-    def extract_paths_and_methods(self):
-        """Extract paths and methods from the OpenAPI spec and save each to a separate file."""
-        spec = self.load_spec()
-        paths = spec.get("paths", {})
-
-        for path, methods in paths.items():
-            for method, operation in methods.items():
-                self.get_file_name(spec, path, method, operation)
-        print(f"\n📁 Output directory: {self.output_dir}")
-        return self.output_dir
-
-    def get_file_name(self, spec, path, method, operation):
-        """Create a mini OpenAPI spec for the given path and method, and save it to a file."""
-        mini_spec = {
-            "paths": {
-                path: {
-                    method: operation
-                }
-            },
-            "components": spec.get("components", {})
+    def test_file_names(self):
+        """Map every operation of the spec, as a (path, method) tuple, to the name of its generated test file."""
+        return {
+            (path, method): f"{self.sanitize_filename(path, method)}.spec.js"
+            for path, method, _ in self.spec.operations()
         }
 
-        filename = self.sanitize_filename(path, method) + ".json"
-        output_file = self.output_dir / filename
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(mini_spec, f, indent=2)
+    def load_spec(self):
+        """Return the parsed OpenAPI spec shared with the rest of the pipeline."""
+        return self.spec.data
 
-        print(f"✅ Saved: {output_file}")
+    def iter_operations(self, wanted=None):
+        """
+        Lazily build the mini-spec of every operation, or only of the wanted ones.
+        :param wanted: Optional collection of (path, method) tuples to extract.
+        :return: A generator of ExtractedOperation objects, in spec order.
+        """
+        if wanted is not None:
+            wanted = set(wanted)
+        for path, method, operation in self.spec.operations():
+            if wanted is None or (path, method) in wanted:
+                yield self.extract_operation(path, method, operation)
 
-    def get_update_add_paths_and_methods(self, added_paths, updated_paths):
-        """Extract only the added or updated paths and methods from the OpenAPI spec and save each to a separate file."""
-        spec = self.load_spec()
-        paths = spec.get("paths", {})
+    def extract_operation(self, path, method, operation):
+        """
+        Build the mini-spec of one operation and record it; with save_to_disk it is written out as well.
+        :return: An ExtractedOperation.
+        """
+        stem = self.sanitize_filename(path, method)
+        extracted = ExtractedOperation(stem, path, method, self.spec.input_fingerprints[(path, method)],
+                                       build_mini_spec(self.spec, path, method, operation), self.spec.resolver)
+        self.extracted[stem] = {
+            "path": path,
+            "method": method,
+            "fingerprint": extracted.fingerprint,
+        }
+        if self.save_to_disk:
+            self.save_operation(extracted)
+        return extracted
 
-        for path, methods in paths.items():
-            if path in updated_paths or path in added_paths:
-                for method, operation in methods.items():
-                    self.get_file_name(spec, path, method, operation)
-        return self.output_dir
+    def save_operation(self, extracted: ExtractedOperation):
+        """Write one extracted mini-spec to output_dir as indented JSON."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = self.output_dir / extracted.name
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(extracted.spec, f, indent=2)
+        print(f"✅ Saved: {output_file}")
 
-    def remove_files(self, deleted_paths, target_folder):
-        """Remove files corresponding to the deleted paths from the target folder."""
+    def remove_files(self, deleted_paths, target_folder, manifest=None):
+        """
+        Remove files corresponding to the deleted paths from the target folder.
+        With a manifest, the deleted entries are exact test file names and are looked up directly.
+        """
+        if manifest is not None:
+            return self.remove_manifest_files(deleted_paths, target_folder, manifest)
         try:
             clean_data = [path.strip("/").replace("/", "_").replace("{", "").replace("}", "") for path in deleted_paths]
             target_folder += "/tests"
@@ -97,3 +140,16 @@ class PathMethodExtractor:
                         print(f"Failed to delete {file_path}: {e}")
         except Exception as e:
             print(f"Error accessing folder {target_folder}: {e}")
+
+    def remove_manifest_files(self, deleted_files, target_folder, manifest):
+        """Delete obsolete test files recorded in the generation manifest and drop them from it."""
+        tests_dir = os.path.join(target_folder, "tests")
+        for name in deleted_files:
+            file_path = os.path.join(tests_dir, name)
+            try:
+                if os.path.isfile(file_path):
+                    os.remove(file_path)
+                    print(f"Deleted: {file_path}")
+                manifest.remove(name)
+            except Exception as e:
+                print(f"Failed to delete {file_path}: {e}")
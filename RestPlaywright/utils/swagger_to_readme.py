@@ -1,46 +1,31 @@
-import os
-import json
-import yaml
 from pathlib import Path
+from RestPlaywright.utils.spec_document import SpecDocument
 
 
 class SwaggerToReadme:
-    def __init__(self, swagger_path, output_path):
-        self.swagger_path = Path(swagger_path)
+    def __init__(self, spec: SpecDocument, output_path):
+        self.spec = SpecDocument.coerce(spec)
         self.output_path = Path(output_path) / "README.MD"
-        self.swagger = self._load_swagger()
-
-    def _load_swagger(self):
-        """Load the Swagger/OpenAPI spec from JSON or YAML file."""
-        ext = self.swagger_path.suffix.lower()
-        with open(self.swagger_path, "r", encoding="utf-8") as f:
-            if ext == ".json":
-                return json.load(f)
-            elif ext in [".yaml", ".yml"]:
-                return yaml.safe_load(f)
-            else:
-                raise ValueError("Swagger file must be JSON or YAML")
+        self.swagger = self.spec.data
 
     def generate_readme(self):
         """Generate a README.md file summarizing the API from the Swagger spec."""
-        info = self.swagger.get("info", {})
+        info = self.spec.info
         title = info.get("title", "API")
         version = info.get("version", "N/A")
         description = info.get("description", "").strip()
 
-        servers = self.swagger.get("servers", [])
+        servers = self.spec.servers
         base_urls = [s.get("url") for s in servers] if servers else ["N/A"]
 
         # Extract endpoints
-        paths = self.swagger.get("paths", {})
         endpoints_summary = []
-        for path, methods in paths.items():
-            for method, details in methods.items():
-                summary = details.get("summary", "")
-                endpoints_summary.append(f"- `{method.upper()} {path}` → {summary}")
+        for path, method, details in self.spec.operations():
+            summary = details.get("summary", "")
+            endpoints_summary.append(f"- `{method.upper()} {path}` → {summary}")
 
         # Extract security/auth info
-        security_schemes = self.swagger.get("components", {}).get("securitySchemes", {})
+        security_schemes = self.spec.security_schemes
         auth_summary = []
         for name, scheme in security_schemes.items():
             scheme_in = scheme.get("in", "")
@@ -0,0 +1,119 @@
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Generated tests use `import` statements; a file that only parses as CommonJS is accepted as well.
+INPUT_TYPES = ("module", "commonjs")
+
+
+class SyntaxChecker:
+    """
+    Parses generated test files with ``node --check`` in a pool of worker threads (each check is its own node
+    process), so a reply that is not valid JavaScript is found right after generation instead of when
+    ``npx playwright test`` fails to load the suite.
+    """
+
+    def __init__(self, enabled: bool = True, workers: int = None, retries: int = 1, node: str = "node",
+                 timeout: float = 30):
+        self.enabled = enabled
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.retries = max(0, retries)
+        self.node = shutil.which(node) if enabled else None
+        self.timeout = timeout
+        if enabled and self.node is None:
+            print(f"⚠️ '{node}' not found in PATH; generated tests are not syntax-checked.")
+            self.enabled = False
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the checker from SYNTAX_CHECK (default true), SYNTAX_CHECK_WORKERS (default: CPU count),
+        SYNTAX_CHECK_RETRIES (regenerations per broken file, default 1) and SYNTAX_CHECK_NODE (default node).
+        """
+        workers = os.getenv("SYNTAX_CHECK_WORKERS")
+        return cls(
+            enabled=os.getenv("SYNTAX_CHECK", "true").lower() == "true",
+            workers=int(workers) if workers else None,
+            retries=int(os.getenv("SYNTAX_CHECK_RETRIES", "1")),
+            node=os.getenv("SYNTAX_CHECK_NODE", "node"),
+        )
+
+    def check_file(self, path: Path):
+        """
+        Parse one file without running it.
+        :param path: The JavaScript file.
+        :return: The parser error (location, source line and message), or None when the file is valid.
+        """
+        path = Path(path)
+        try:
+            source = path.read_text(encoding="utf-8")
+        except OSError as e:
+            return str(e)
+        error = None
+        for input_type in INPUT_TYPES:
+            try:
+                completed = subprocess.run(
+                    [self.node, "--check", f"--input-type={input_type}", "-"], input=source, text=True,
+                    encoding="utf-8", capture_output=True, timeout=self.timeout,
+                )
+            except subprocess.TimeoutExpired:
+                return f"node --check timed out after {self.timeout}s"
+            if completed.returncode == 0:
+                return None
+            # Report the module parse error: that is how Playwright loads the tests.
+            if error is None:
+                error = format_node_error(completed.stderr, path.name)
+        return error
+
+    def check_files(self, files) -> dict:
+        """
+        Parse several files in parallel.
+        :param files: The file paths.
+        :return: file path -> parser error, for the files that failed only.
+        """
+        files = list(dict.fromkeys(Path(f) for f in files))
+        if not self.enabled or not files:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(files))) as executor:
+            results = executor.map(self.check_file, files)
+            return {file: error for file, error in zip(files, results) if error is not None}
+
+
+def format_node_error(stderr: str, file_name: str) -> str:
+    """
+    Keep the useful part of node's report: the location, the offending line with its caret and the message,
+    without the stack trace of node's own checker.
+    :param stderr: node's standard error output.
+    :param file_name: Name to report instead of "[stdin]".
+    :return: The trimmed error.
+    """
+    lines = []
+    for line in stderr.splitlines():
+        if line.startswith("    at ") or line.startswith("Node.js v"):
+            break
+        lines.append(line.replace("[stdin]", file_name))
+    return "\n".join(lines).strip() or stderr.strip()
+
+
+def main(argv=None):
+    """Syntax-check the .js files of the given folders or files: python -m RestPlaywright.utils.syntax_checker tests"""
+    files = []
+    for arg in (argv if argv is not None else sys.argv[1:]):
+        path = Path(arg)
+        if path.is_dir():
+            files.extend(f for f in sorted(path.rglob("*.js")) if "node_modules" not in f.parts)
+        else:
+            files.append(path)
+    checker = SyntaxChecker.from_env()
+    errors = checker.check_files(files)
+    for file, error in sorted(errors.items()):
+        print(f"❌ {file}\n{error}\n")
+    print(f"🔎 {len(files) - len(errors)} of {len(files)} files parsed")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+from RestPlaywright.utils.spec_document import SpecDocument
+from RestPlaywright.utils.spec_fingerprint import component_fingerprints, fingerprint
+from RestPlaywright.utils.spec_refs import HTTP_METHODS
+from RestPlaywright.utils.state import get_state_dir
+
+
+def validator_version() -> str:
+    """Installed openapi-spec-validator version (read from package metadata, without importing it)."""
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version("openapi-spec-validator")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def spec_content_hash(spec: SpecDocument) -> str:
+    """
+    Hash of the spec content: the raw file bytes when the spec was loaded from a file, else its canonical JSON.
+    :param spec: The spec document.
+    :return: A hex digest.
+    """
+    if spec.path is not None and spec.path.exists():
+        digest = hashlib.sha256()
+        with open(spec.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    return fingerprint(spec.data)
+
+
+def global_fingerprint(spec: SpecDocument) -> str:
+    """Fingerprint of everything outside operations and components (openapi, info, servers, security, ...)."""
+    top_level = {key: value for key, value in spec.data.items() if key not in ("paths", "components")}
+    path_level = {
+        path: {key: value for key, value in (path_item or {}).items()
+               if key not in HTTP_METHODS and key != "parameters"}
+        for path, path_item in spec.paths.items()
+    }
+    return fingerprint({"top_level": top_level, "path_level": path_level})
+
+
+def operation_key(path: str, method: str) -> str:
+    """JSON-friendly key of an operation, e.g. "GET /pet/{petId}"."""
+    return f"{method.upper()} {path}"
+
+
+class ValidationCache:
+    """
+    Result of the last successful validation of a target project's spec.
+
+    ``<TARGET_FOLDER>/.restplaywright/validation.json`` holds the content hash of the last spec that passed
+    validation, plus the fingerprints of its operations, components and everything else. An identical spec is
+    not validated again; for a spec whose top-level parts are unchanged, only the changed operations and
+    components need to be.
+    """
+
+    FILE_NAME = "validation.json"
+    VERSION = 1
+
+    def __init__(self, target_folder: str, enabled: bool = True):
+        self.enabled = enabled
+        self.path = get_state_dir(target_folder) / self.FILE_NAME
+        self.data = {}
+        if enabled:
+            self.load()
+
+    @classmethod
+    def from_env(cls, target_folder: str):
+        """Build the cache from VALIDATION_CACHE (default true)."""
+        return cls(target_folder, enabled=os.getenv("VALIDATION_CACHE", "true").lower() == "true")
+
+    def load(self):
+        """Load the last validation result, ignoring it if unreadable or written by another validator version."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable validation cache {self.path}: {e}")
+            return
+        if data.get("version") == self.VERSION and data.get("validator") == validator_version():
+            self.data = data
+
+    def is_validated(self, content_hash: str) -> bool:
+        """Whether a spec with exactly this content already passed validation."""
+        return self.enabled and self.data.get("content_hash") == content_hash
+
+    def changes(self, spec: SpecDocument):
+        """
+        Work out what changed since the last validated spec.
+        :param spec: The new spec.
+        :return: A (operations, components) tuple of changed (path, method) keys and component references, or
+            None when the spec can only be validated as a whole (no previous result, or top-level changes).
+        """
+        if not self.enabled or not self.data or self.data.get("global") != global_fingerprint(spec):
+            return None
+        old_operations = self.data.get("operations", {})
+        old_components = self.data.get("components", {})
+        operations = [key for key, value in spec.input_fingerprints.items()
+                      if old_operations.get(operation_key(*key)) != value]
+        components = [ref for ref, value in component_fingerprints(spec.data).items()
+                      if old_components.get(ref) != value]
+        return operations, components
+
+    def record(self, spec: SpecDocument, content_hash: str):
+        """Remember a spec that passed validation and write the cache atomically."""
+        if not self.enabled:
+            return
+        self.data = {
+            "version": self.VERSION,
+            "validator": validator_version(),
+            "content_hash": content_hash,
+            "global": global_fingerprint(spec),
+            "operations": {operation_key(*key): value for key, value in spec.input_fingerprints.items()},
+            "components": component_fingerprints(spec.data),
+        }
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
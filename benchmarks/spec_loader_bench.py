@@ -0,0 +1,95 @@
+"""Compare the spec parsing backends of RestPlaywright.utils.spec_loader on synthetic specs."""
+import json
+import sys
+import time
+import yaml
+from RestPlaywright.utils.spec_loader import YAML_LOADER, backend_names, orjson, parse_yaml
+
+
+def synthetic_spec(operations: int) -> dict:
+    """
+    Build an OpenAPI spec shaped like ours: operations with parameters and responses, plus shared schemas.
+    :param operations: Number of operations.
+    :return: The spec.
+    """
+    schemas = {
+        f"Model{i}": {
+            "type": "object",
+            "required": ["id"],
+            "properties": {
+                "id": {"type": "integer", "format": "int64"},
+                "name": {"type": "string", "description": "Display name of the item", "example": "item"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "parent": {"$ref": f"#/components/schemas/Model{max(i - 1, 0)}"},
+            },
+        }
+        for i in range(max(1, operations // 4))
+    }
+    paths = {}
+    for i in range(operations):
+        model = f"#/components/schemas/Model{i % len(schemas)}"
+        paths[f"/items{i}/{{itemId}}"] = {
+            "get": {
+                "summary": f"Get item {i}",
+                "operationId": f"getItem{i}",
+                "parameters": [{"name": "itemId", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                "responses": {
+                    "200": {"description": "OK", "content": {"application/json": {"schema": {"$ref": model}}}},
+                    "404": {"description": "Not found"},
+                },
+            }
+        }
+    return {"openapi": "3.0.3", "info": {"title": "Benchmark", "version": "1.0.0"}, "paths": paths,
+            "components": {"schemas": schemas}}
+
+
+def _time(parse, data, repeat: int) -> float:
+    """Best wall time of ``repeat`` parses, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(data)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def benchmark(sizes_mb=(1, 5, 20), repeat: int = 1):
+    """
+    Compare the parsing backends on synthetic specs of the given sizes.
+    :param sizes_mb: Approximate JSON sizes of the specs to test, in MB.
+    :param repeat: Parses per backend; the best time is reported.
+    :return: A list of (size label, format, backend, milliseconds) rows.
+    """
+    backends = {"json": [("json", json.loads)], "yaml": [("pure-python", lambda d: yaml.load(d, yaml.SafeLoader))]}
+    if orjson is not None:
+        backends["json"].append(("orjson", orjson.loads))
+    if YAML_LOADER is not yaml.SafeLoader:
+        backends["yaml"].append(("libyaml", parse_yaml))
+
+    # Calibrate the operation count against the indented JSON size of a small sample.
+    bytes_per_operation = len(json.dumps(synthetic_spec(100), indent=2)) / 100
+    rows = []
+    for size in sizes_mb:
+        spec = synthetic_spec(int(size * 1024 * 1024 / bytes_per_operation))
+        documents = {
+            "json": json.dumps(spec, indent=2).encode("utf-8"),
+            "yaml": yaml.dump(spec, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper), sort_keys=False).encode("utf-8"),
+        }
+        for fmt, data in documents.items():
+            label = f"{len(data) / (1024 * 1024):.1f} MB"
+            for name, parse in backends[fmt]:
+                rows.append((label, fmt, name, _time(parse, data, repeat)))
+    return rows
+
+
+def main(argv=None):
+    """Print the benchmark: python -m benchmarks.spec_loader_bench [size_mb ...]"""
+    argv = argv if argv is not None else sys.argv[1:]
+    sizes = [float(arg) for arg in argv] or [1, 5, 20]
+    print(f"⚙️ Backends in use: {backend_names()}")
+    for label, fmt, name, ms in benchmark(sizes):
+        print(f"   {label:>8} {fmt:<5} {name:<12} {ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
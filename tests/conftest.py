@@ -0,0 +1,11 @@
+import pytest
+from RestPlaywright.utils import llm
+from fake_llm import FakePrefixCachingChatModel
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Replace the shared LLM client with a local fake model for the duration of a test."""
+    model = FakePrefixCachingChatModel()
+    monkeypatch.setattr(llm, "_llm", model)
+    return model
@@ -0,0 +1,96 @@
+import hashlib
+import re
+import threading
+from RestPlaywright.utils.operation_splitter import estimate_tokens
+
+
+class FakePrefixCachingChatModel:
+    """
+    Local stand-in for a chat model provider, installed as the shared LLM client by the ``fake_model`` fixture.
+
+    It answers every prompt with a small, valid Playwright test and behaves like a provider with automatic
+    prompt caching: every message prefix it has seen is remembered, and the longest previously seen prefix of
+    a new request is reported as cached input tokens (usage_metadata.input_token_details.cache_read). This
+    makes prefix reuse observable without network access or API keys. The messages of every call are kept
+    in ``requests``.
+    """
+
+    def __init__(self, model: str = None):
+        self.model = model or "fake"
+        self.calls = 0
+        self.cache_read_tokens = 0
+        self.input_tokens = 0
+        self.requests = []
+        self._prefixes = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _content(message) -> str:
+        content = message.content
+        if isinstance(content, str):
+            return content
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+
+    def _usage(self, messages, reply: str) -> dict:
+        digest = hashlib.sha256()
+        prefix_hashes = []
+        token_counts = []
+        for message in messages:
+            digest.update(message.type.encode("utf-8") + b"\0" + self._content(message).encode("utf-8") + b"\0")
+            prefix_hashes.append(digest.copy().hexdigest())
+            token_counts.append(estimate_tokens(self._content(message)))
+
+        with self._lock:
+            cached = 0
+            # The last message is the new request; only earlier prefixes can be cached.
+            for index, prefix in enumerate(prefix_hashes[:-1]):
+                if prefix not in self._prefixes:
+                    break
+                cached += token_counts[index]
+            self._prefixes.update(prefix_hashes)
+            input_tokens = sum(token_counts)
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.cache_read_tokens += cached
+
+        output_tokens = estimate_tokens(reply)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached},
+        }
+
+    def _reply(self, messages) -> str:
+        prompt = self._content(messages[-1])
+        names = re.findall(r"// === FILE: (\S+) ===", prompt)
+        if names:
+            return "\n".join(f"// === FILE: {name} ===\n{self._test(name)}" for name in names)
+        match = re.search(r"OpenAPI file: \*\*(.+?)\*\*", prompt)
+        return f"```javascript\n{self._test(match.group(1) if match else 'operation')}\n```"
+
+    @staticmethod
+    def _test(name: str) -> str:
+        return (
+            "import { expect } from '@playwright/test'\n"
+            "import { test } from '../fixtures/apiWithAllure'\n\n"
+            f"test('{name}', async ({{ request, baseURL }}) => {{\n"
+            "  expect(baseURL).toBeTruthy()\n"
+            "})"
+        )
+
+    def invoke(self, messages):
+        from langchain_core.messages import AIMessage
+
+        self.requests.append(messages)
+        reply = self._reply(messages)
+        return AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+
+    def stream(self, messages):
+        from langchain_core.messages import AIMessageChunk
+
+        self.requests.append(messages)
+        reply = self._reply(messages)
+        for start in range(0, len(reply), 16):
+            yield AIMessageChunk(content=reply[start:start + 16])
+        yield AIMessageChunk(content="", usage_metadata=self._usage(messages, reply))
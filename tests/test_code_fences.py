@@ -0,0 +1,71 @@
+import random
+
+import pytest
+from RestPlaywright.utils.llm_processor import StreamingFenceStripper, strip_code_fences
+
+REPLIES = [
+    "```javascript\nimport { test } from '@playwright/test';\n\ntest('a', async () => {});\n```",
+    "```js\r\nconst a = 1;\r\n```\r\n",
+    "\n\n  ```ts\nconst a = 1;\n```\n\n\n",
+    "const a = 1;\nconst b = 2;\n",
+    "```\ncode\n```\nmore code\n```",
+    "```js\n\n\n  indented();\n\n```",
+    "```js\n```",
+    "```js",
+    "```",
+    "",
+    "   \n\t\n",
+    "single line",
+    "  leading and trailing spaces  ",
+    "```js\nconst s = `\n```\n`;\n  ```  \n",
+    "```js\ncode\n```\n\n   \n",
+    "```js\rcode\r```\r",
+    "```js\ncode\x0bmore\x0c```",
+    "```js\ncode\u2028```\u2029\n",
+    "code\n``` trailing text",
+    "```python\nprint(1)\n```",
+]
+
+
+def stream(text, sizes):
+    stripper = StreamingFenceStripper()
+    out, position = [], 0
+    for size in sizes:
+        out.append(stripper.feed(text[position:position + size]))
+        position += size
+    out.append(stripper.feed(text[position:]))
+    out.append(stripper.finish())
+    return "".join(out)
+
+
+@pytest.mark.parametrize("reply", REPLIES)
+def test_stream_in_one_chunk_matches_strip_code_fences(reply):
+    assert stream(reply, []) == strip_code_fences(reply)
+
+
+@pytest.mark.parametrize("reply", REPLIES)
+def test_stream_one_character_at_a_time_matches_strip_code_fences(reply):
+    assert stream(reply, [1] * len(reply)) == strip_code_fences(reply)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_stream_split_at_random_points_matches_strip_code_fences(seed):
+    rng = random.Random(seed)
+    reply = rng.choice(REPLIES)
+    if rng.random() < 0.5:
+        # Random replies built from the characters that matter for fences and line boundaries.
+        reply = "".join(rng.choice(["```", "js", "\n", "\r", "\r\n", " ", "\t", "x", "\x0c", "\u2028"])
+                        for _ in range(rng.randint(0, 30)))
+    sizes = [rng.randint(0, 6) for _ in range(rng.randint(0, len(reply) + 1))]
+
+    assert stream(reply, sizes) == strip_code_fences(reply), repr((reply, sizes))
+
+
+def test_code_is_released_before_the_stream_ends():
+    stripper = StreamingFenceStripper()
+
+    assert stripper.feed("```js\nline one\nline") == "line one\n"
+    assert stripper.feed(" two\n```") == "line two\n"
+    assert stripper.feed("\n") == ""
+    assert stripper.feed("line three\n") == "```\n"
+    assert stripper.finish() == "line three"
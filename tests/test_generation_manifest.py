@@ -0,0 +1,148 @@
+import copy
+import json
+
+import pytest
+from RestPlaywright.utils.generation_manifest import GenerationManifest
+from RestPlaywright.utils.spec_document import SpecDocument
+from RestPlaywright.utils.swagger_extractor import PathMethodExtractor
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {
+        "/pets": {
+            "get": {"responses": {"200": {"description": "ok", "content": {"application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}}}}}}},
+            "post": {"responses": {"201": {"description": "created"}}},
+        },
+        "/pets/{id}": {"delete": {"responses": {"204": {"description": "gone"}}}},
+    },
+    "components": {"schemas": {"Pet": {"type": "object", "properties": {"id": {"type": "integer"}}}}},
+}
+
+
+def changed_spec(change):
+    data = copy.deepcopy(SPEC)
+    change(data)
+    return SpecDocument(data)
+
+
+def generate(manifest, spec, model="gpt-4o", provider="openai"):
+    """Write a test file for every operation and record it, as LLMProcessor does."""
+    file_names = PathMethodExtractor(spec).test_file_names()
+    for op, fingerprint in spec.input_fingerprints.items():
+        (manifest.target_folder / "tests" / file_names[op]).write_text("// test", encoding="utf-8")
+        manifest.record(file_names[op], op[0], op[1], fingerprint, model, provider)
+    return file_names
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    (tmp_path / "tests").mkdir()
+    manifest = GenerationManifest(tmp_path)
+    return manifest
+
+
+def test_save_and_load_round_trip(manifest, tmp_path):
+    spec = SpecDocument(copy.deepcopy(SPEC))
+    generate(manifest, spec)
+    manifest.save()
+
+    loaded = GenerationManifest(tmp_path)
+
+    assert loaded.entries == manifest.entries
+    assert json.loads(manifest.path.read_text(encoding="utf-8"))["version"] == GenerationManifest.VERSION
+    assert not manifest.path.with_suffix(".json.tmp").exists()
+
+
+def test_unreadable_manifest_starts_empty(manifest, tmp_path):
+    manifest.path.write_text("{not json", encoding="utf-8")
+
+    assert GenerationManifest(tmp_path).entries == {}
+
+
+def test_unchanged_spec_has_no_changes(manifest):
+    spec = SpecDocument(copy.deepcopy(SPEC))
+    file_names = generate(manifest, spec)
+
+    assert manifest.diff(spec, file_names, "gpt-4o", "openai") == {
+        "added": [], "updated": [], "deleted": [], "components": []}
+
+
+def test_diff_reports_added_updated_and_deleted(manifest):
+    generate(manifest, SpecDocument(copy.deepcopy(SPEC)))
+
+    def change(data):
+        data["components"]["schemas"]["Pet"]["properties"]["name"] = {"type": "string"}
+        del data["paths"]["/pets/{id}"]
+        data["paths"]["/owners"] = {"get": {"responses": {"200": {"description": "ok"}}}}
+
+    spec = changed_spec(change)
+    file_names = PathMethodExtractor(spec).test_file_names()
+
+    result = manifest.diff(spec, file_names, "gpt-4o", "openai")
+
+    assert result["added"] == [("/owners", "get")]
+    assert result["updated"] == [("/pets", "get")]
+    assert result["deleted"] == ["pets_id_DELETE.spec.js"]
+
+
+def test_missing_test_file_is_added_again(manifest):
+    spec = SpecDocument(copy.deepcopy(SPEC))
+    file_names = generate(manifest, spec)
+    (manifest.target_folder / "tests" / file_names[("/pets", "post")]).unlink()
+
+    assert manifest.diff(spec, file_names, "gpt-4o", "openai")["added"] == [("/pets", "post")]
+
+
+@pytest.mark.parametrize("model, provider", [("claude-sonnet", "openai"), ("gpt-4o", "anthropic")])
+def test_other_model_or_provider_regenerates_everything(manifest, model, provider):
+    spec = SpecDocument(copy.deepcopy(SPEC))
+    file_names = generate(manifest, spec)
+
+    result = manifest.diff(spec, file_names, model, provider)
+
+    assert sorted(result["updated"]) == sorted(spec.input_fingerprints)
+    assert result["added"] == [] and result["deleted"] == []
+
+
+def test_seed_adopts_existing_files_except_the_excluded(manifest):
+    spec = SpecDocument(copy.deepcopy(SPEC))
+    file_names = PathMethodExtractor(spec).test_file_names()
+    for op in (("/pets", "get"), ("/pets", "post")):
+        (manifest.target_folder / "tests" / file_names[op]).write_text("// test", encoding="utf-8")
+
+    adopted = manifest.seed(spec, file_names, exclude=[("/pets", "post")])
+
+    assert adopted == 1
+    assert list(manifest.entries) == [file_names[("/pets", "get")]]
+    assert manifest.entries[file_names[("/pets", "get")]]["model"] is None
+
+
+def test_seeded_files_are_kept_on_model_change(manifest):
+    spec = SpecDocument(copy.deepcopy(SPEC))
+    file_names = PathMethodExtractor(spec).test_file_names()
+    for name in file_names.values():
+        (manifest.target_folder / "tests" / name).write_text("// test", encoding="utf-8")
+    manifest.seed(spec, file_names)
+
+    assert manifest.diff(spec, file_names, "gpt-4o", "openai")["updated"] == []
+
+
+def test_seeded_file_of_a_removed_operation_is_deleted(manifest):
+    old_spec = SpecDocument(copy.deepcopy(SPEC))
+    old_names = PathMethodExtractor(old_spec).test_file_names()
+    for name in old_names.values():
+        (manifest.target_folder / "tests" / name).write_text("// test", encoding="utf-8")
+    manifest.seed(old_spec, old_names)
+
+    spec = changed_spec(lambda data: data["paths"].pop("/pets/{id}"))
+    extractor = PathMethodExtractor(spec)
+    result = manifest.diff(spec, extractor.test_file_names())
+    extractor.remove_files(result["deleted"], str(manifest.target_folder), manifest)
+
+    removed = old_names[("/pets/{id}", "delete")]
+    assert result["deleted"] == [removed]
+    assert not (manifest.target_folder / "tests" / removed).exists()
+    assert removed not in manifest.entries
+    assert sorted(manifest.entries) == sorted(extractor.test_file_names().values())
@@ -0,0 +1,105 @@
+import copy
+
+from RestPlaywright.utils.latest_swagger_file import compare_swagger_paths
+from RestPlaywright.utils.spec_fingerprint import operation_input_fingerprints
+
+
+def schema_ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def json_response(schema):
+    return {"200": {"description": "ok", "content": {"application/json": {"schema": schema}}}}
+
+
+OLD_SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {
+        "/pets": {
+            "get": {"parameters": [{"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                                   {"name": "tag", "in": "query", "schema": {"type": "string"}}],
+                    "responses": json_response({"type": "array", "items": schema_ref("Pet")})},
+            "post": {"requestBody": {"content": {"application/json": {"schema": schema_ref("NewPet")}}},
+                     "responses": json_response(schema_ref("Pet"))},
+        },
+        "/categories": {"get": {"responses": json_response({"type": "array", "items": schema_ref("Category")})}},
+        "/owners": {"get": {"responses": json_response({"type": "array", "items": schema_ref("Owner")})}},
+        "/stores/{id}": {"delete": {"responses": {"204": {"description": "gone"}}}},
+    },
+    "components": {
+        "schemas": {
+            "Pet": {"type": "object", "properties": {"id": {"type": "integer"}, "category": schema_ref("Category")}},
+            "NewPet": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "Category": {"type": "object", "properties": {"name": {"type": "string"}, "tag": schema_ref("Tag")}},
+            "Tag": {"type": "object", "properties": {"label": {"type": "string"}}},
+            "Owner": {"type": "object", "properties": {"name": {"type": "string"}}},
+        },
+    },
+}
+
+
+def reorder(obj):
+    """Reverse the key order of every dict and the item order of every list."""
+    if isinstance(obj, dict):
+        return {key: reorder(value) for key, value in reversed(list(obj.items()))}
+    if isinstance(obj, list):
+        return [reorder(item) for item in reversed(obj)]
+    return obj
+
+
+def test_identical_specs_have_no_changes():
+    result = compare_swagger_paths(OLD_SPEC, copy.deepcopy(OLD_SPEC))
+
+    assert result == {"added": [], "deleted": [], "updated": [], "components": []}
+
+
+def test_reordering_keys_and_lists_is_not_a_change():
+    new_spec = reorder(OLD_SPEC)
+
+    assert compare_swagger_paths(OLD_SPEC, new_spec) == {"added": [], "deleted": [], "updated": [], "components": []}
+    assert operation_input_fingerprints(new_spec) == operation_input_fingerprints(OLD_SPEC)
+
+
+def test_component_change_updates_its_transitive_dependents():
+    new_spec = copy.deepcopy(OLD_SPEC)
+    new_spec["components"]["schemas"]["Tag"]["properties"]["color"] = {"type": "string"}
+
+    result = compare_swagger_paths(OLD_SPEC, new_spec)
+
+    assert result["components"] == ["#/components/schemas/Tag"]
+    # Tag <- Category <- Pet: every operation that reaches Tag through them, but not GET /owners.
+    assert sorted(result["updated"]) == [("/categories", "get"), ("/pets", "get"), ("/pets", "post")]
+    assert result["added"] == [] and result["deleted"] == []
+
+
+def test_component_change_changes_only_dependent_input_fingerprints():
+    new_spec = copy.deepcopy(OLD_SPEC)
+    new_spec["components"]["schemas"]["Tag"]["properties"]["color"] = {"type": "string"}
+
+    old, new = operation_input_fingerprints(OLD_SPEC), operation_input_fingerprints(new_spec)
+
+    assert sorted(op for op in new if old[op] != new[op]) == [("/categories", "get"), ("/pets", "get"),
+                                                             ("/pets", "post")]
+
+
+def test_operation_change_is_reported_once():
+    new_spec = copy.deepcopy(OLD_SPEC)
+    new_spec["paths"]["/pets"]["get"]["parameters"].append({"name": "page", "in": "query"})
+    new_spec["components"]["schemas"]["Pet"]["properties"]["name"] = {"type": "string"}
+
+    result = compare_swagger_paths(OLD_SPEC, new_spec)
+
+    assert sorted(result["updated"]) == [("/pets", "get"), ("/pets", "post")]
+
+
+def test_added_and_removed_paths():
+    new_spec = copy.deepcopy(OLD_SPEC)
+    del new_spec["paths"]["/stores/{id}"]
+    new_spec["paths"]["/stores"] = {"get": {"responses": {"200": {"description": "ok"}}}}
+
+    result = compare_swagger_paths(OLD_SPEC, new_spec)
+
+    assert result["added"] == [("/stores", "get")]
+    assert result["deleted"] == ["stores_{id}_DELETE"]
+    assert result["updated"] == []
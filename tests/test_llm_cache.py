@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+from RestPlaywright.utils.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(tmp_path / "cache")
+
+
+def test_put_then_get(cache):
+    key = LLMResponseCache.make_key("gpt-4o", "openai", "prompt", "javascript", {"paths": {}})
+    cache.put(key, "test('a', () => {});", file="a.json")
+
+    assert cache.get(key) == "test('a', () => {});"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_missing_entry_is_a_miss(cache):
+    assert cache.get("ab" + "0" * 62) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+@pytest.mark.parametrize("content", ["{not json", "[1, 2]", '"reply"', '{"created": 1}', '{"reply": 42}',
+                                     b"\xff\xfe"])
+def test_corrupt_entry_is_a_miss_and_dropped(cache, content):
+    key = "cd" + "0" * 62
+    path = cache._entry_path(key)
+    path.parent.mkdir(parents=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content, encoding="utf-8")
+
+    assert cache.get(key) is None
+    assert cache.misses == 1
+    assert not path.exists()
+
+    cache.put(key, "regenerated")
+    assert cache.get(key) == "regenerated"
+
+
+def test_counters_are_exact_under_concurrency(cache):
+    cache.put("ef" + "0" * 62, "reply")
+    barrier = threading.Barrier(8)
+
+    def lookups():
+        barrier.wait()
+        for _ in range(200):
+            cache.get("ef" + "0" * 62)
+            cache.get("ef" + "1" * 62)
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (cache.hits, cache.misses) == (1600, 1600)
+
+
+def test_disabled_cache_is_bypassed(tmp_path):
+    cache = LLMResponseCache(tmp_path / "cache", enabled=False)
+    cache.put("ab" + "0" * 62, "reply")
+
+    assert cache.get("ab" + "0" * 62) is None
+    assert not (tmp_path / "cache").exists()
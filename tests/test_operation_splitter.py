@@ -0,0 +1,63 @@
+import pytest
+from RestPlaywright.utils.operation_splitter import merge_spec_files, parse_import, split_imports
+from RestPlaywright.utils.syntax_checker import SyntaxChecker
+
+checker = SyntaxChecker(workers=1)
+requires_node = pytest.mark.skipif(not checker.enabled, reason="node is not installed")
+
+
+def assert_parses(tmp_path, code):
+    path = tmp_path / "merged.spec.js"
+    path.write_text(code, encoding="utf-8")
+    assert checker.check_file(path) is None, code
+
+
+@requires_node
+def test_merge_combines_named_imports_per_module(tmp_path):
+    combined = (
+        "import { test, expect } from '@playwright/test';\n\n"
+        "test('a', async () => { expect(1).toBe(1); });\n"
+    )
+    separate = (
+        "import { test } from '@playwright/test';\n"
+        "import { expect } from '@playwright/test';\n"
+        "import {\n  faker,\n} from '@faker-js/faker';\n\n"
+        "test('b', async () => { expect(faker).toBeTruthy(); });\n"
+    )
+    merged = merge_spec_files([("json", combined), ("xml", separate)])
+
+    assert merged.count("import ") == 2
+    assert "import { test, expect } from '@playwright/test';" in merged
+    assert "import { faker } from '@faker-js/faker';" in merged
+    assert_parses(tmp_path, merged)
+
+
+@requires_node
+def test_merge_skips_leading_comments_and_directives(tmp_path):
+    piece = (
+        "// @ts-check\n"
+        "/* Generated test */\n"
+        "'use strict';\n\n"
+        "import { expect } from '@playwright/test';\n"
+        "// fixtures with Allure steps\n"
+        "import { test } from '../fixtures/apiWithAllure';\n\n"
+        "test('c', async () => { expect(2).toBe(2); });\n"
+    )
+    imports, body, header = split_imports(piece)
+
+    assert len(imports) == 2
+    assert body.startswith("test('c'")
+    assert header[0] == "// @ts-check"
+
+    merged = merge_spec_files([("json", piece), ("xml", piece)])
+    assert merged.startswith("// @ts-check\n")
+    assert merged.count("import { test } from '../fixtures/apiWithAllure';") == 1
+    assert all(not line.startswith("import") for line in merged.split("test.describe(", 1)[1].splitlines())
+    assert_parses(tmp_path, merged)
+
+
+def test_parse_import_forms():
+    assert parse_import("import fs from 'fs';") == ("'fs'", "fs", None, [])
+    assert parse_import("import * as path from \"path\"") == ('"path"', None, "path", [])
+    assert parse_import("import base, { a as b, c } from 'x'") == ("'x'", "base", None, [("a", "b"), ("c", "c")])
+    assert parse_import("import 'dotenv/config';") == ("'dotenv/config'", None, None, [])
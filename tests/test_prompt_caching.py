@@ -0,0 +1,59 @@
+import pytest
+from RestPlaywright.utils import llm
+from RestPlaywright.utils.llm_processor import LLMProcessor
+
+
+@pytest.fixture
+def processor_for(monkeypatch, tmp_path, fake_model):
+    def build(provider):
+        monkeypatch.setenv("LLM_MODEL_PROVIDER", provider)
+        monkeypatch.setenv("LLM_MODEL", "fake")
+        monkeypatch.setenv("LLM_CACHE", "false")
+        return LLMProcessor(str(tmp_path), None, "javascript"), fake_model
+    return build
+
+
+def test_second_call_reads_the_static_prefix_from_cache(processor_for):
+    processor, _ = processor_for("openai")
+
+    _, first = processor.generate_reply("a.json", "OpenAPI file: **a.json**", isolated=True)
+    _, second = processor.generate_reply("b.json", "OpenAPI file: **b.json**", isolated=True)
+
+    assert first["cache_read_tokens"] == 0
+    assert second["cache_read_tokens"] > 0
+    assert processor.usage_totals()["cache_read_tokens"] == second["cache_read_tokens"]
+
+
+def test_cache_control_marks_the_end_of_the_prefix(processor_for):
+    processor, model = processor_for("anthropic")
+    assert processor.cache_control
+
+    processor.generate_reply("a.json", "OpenAPI file: **a.json**", isolated=True)
+    _, usage = processor.generate_reply("b.json", "OpenAPI file: **b.json**", isolated=True)
+
+    system, request = model.requests[-1][0], model.requests[-1][-1]
+    assert system.content[0]["cache_control"] == {"type": "ephemeral"}
+    assert isinstance(request.content, str)
+    assert usage["cache_read_tokens"] > 0
+
+
+def test_providers_with_automatic_caching_get_no_breakpoint(processor_for):
+    processor, model = processor_for("openai")
+    assert not processor.cache_control
+
+    processor.generate_reply("a.json", "OpenAPI file: **a.json**", isolated=True)
+
+    assert all(isinstance(message.content, str) for message in model.requests[-1])
+
+
+def test_openai_client_sets_prompt_cache_key(monkeypatch):
+    pytest.importorskip("langchain_openai")
+    monkeypatch.setenv("LLM_MODEL_PROVIDER", "openai")
+    monkeypatch.setenv("LLM_MODEL", "gpt-4o-mini")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("LLM_PROMPT_CACHE_KEY", "my-suite")
+
+    client = llm.get_llm()
+
+    assert client.model_kwargs["prompt_cache_key"] == "my-suite"
+    assert client.stream_usage
@@ -0,0 +1,149 @@
+import email.utils
+import time
+
+import pytest
+from RestPlaywright.utils import rate_limiter
+from RestPlaywright.utils.rate_limiter import (AdaptiveConcurrency, QuotaExhaustedError, RateLimiter,
+                                               is_rate_limit_error, retry_after_seconds)
+
+
+class Response:
+    def __init__(self, status_code=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class ProviderError(Exception):
+    """Shaped like the openai / anthropic SDK errors: a message, a response and an optional body."""
+
+    def __init__(self, message, status_code=None, headers=None, body=None):
+        super().__init__(message)
+        self.response = Response(status_code, headers)
+        self.body = body
+
+
+class RateLimitError(Exception):
+    pass
+
+
+@pytest.mark.parametrize("error", [
+    ProviderError("Too Many Requests", status_code=429),
+    RateLimitError("slow down"),
+    Exception("429 RESOURCE_EXHAUSTED: Quota exceeded for metric generate_content_requests_per_minute"),
+    Exception("Error code: 429"),
+    Exception("Rate limit reached for gpt-4o in organization org-x on tokens per min"),
+    Exception("too many requests, please retry later"),
+])
+def test_throttling_errors_are_rate_limits(error):
+    assert is_rate_limit_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    Exception("Request had 4290 tokens, more than the model accepts"),
+    ProviderError("This model's maximum context is 8192 tokens, the prompt has 142900 tokens", status_code=400),
+    ProviderError("rate limit exceeded", status_code=400),
+    ProviderError("You exceeded your current quota", status_code=500),
+    Exception("Invalid quota project"),
+    ProviderError("You exceeded your current quota", status_code=429, body={"code": "insufficient_quota"}),
+])
+def test_other_errors_are_not_rate_limits(error):
+    assert not is_rate_limit_error(error)
+
+
+def test_retry_after_seconds_header():
+    assert retry_after_seconds(ProviderError("429", headers={"retry-after": "7"})) == 7.0
+
+
+def test_retry_after_milliseconds_header_wins():
+    error = ProviderError("429", headers={"retry-after": "7", "retry-after-ms": "1500"})
+    assert retry_after_seconds(error) == 1.5
+
+
+def test_retry_after_http_date_header():
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= retry_after_seconds(ProviderError("429", headers={"retry-after": date})) <= 30
+
+
+@pytest.mark.parametrize("message, delay", [
+    ("429 RESOURCE_EXHAUSTED. Please retry in 12.5s.", 12.5),
+    ("429 Quota exceeded [violations {} , retry_delay { seconds: 31 }]", 31.0),
+    ("429 Too Many Requests", None),
+])
+def test_retry_after_seconds_from_message(message, delay):
+    assert retry_after_seconds(Exception(message)) == delay
+
+
+def test_quota_exhausted_fails_fast(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda _: pytest.fail("quota errors must not be retried"))
+    limiter = RateLimiter(max_retries=5)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise ProviderError("You exceeded your current quota", status_code=429,
+                            body={"code": "insufficient_quota"})
+
+    with pytest.raises(QuotaExhaustedError):
+        limiter.call(fn, name="a.json")
+    with pytest.raises(QuotaExhaustedError):
+        limiter.call(fn, name="b.json")
+    assert len(calls) == 1
+
+
+def test_rate_limited_call_is_retried_after_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(rate_limiter.time, "sleep", sleeps.append)
+    limiter = RateLimiter(max_retries=3)
+    replies = iter([ProviderError("slow down", status_code=429, headers={"retry-after": "4"}), "ok"])
+
+    def fn():
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    assert limiter.call(fn, name="a.json") == "ok"
+    assert sleeps == [4.0]
+
+
+def test_throttle_halves_once_per_cooldown(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    concurrency = AdaptiveConcurrency(16, cooldown=5)
+
+    # A burst of concurrent failures is one congestion signal.
+    for _ in range(8):
+        concurrency.on_throttle()
+    assert concurrency.limit == 8
+
+    now[0] += 5
+    concurrency.on_throttle()
+    assert concurrency.limit == 4
+
+
+def test_throttle_stops_at_minimum(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    concurrency = AdaptiveConcurrency(4, minimum=2, cooldown=0)
+
+    for _ in range(3):
+        concurrency.on_throttle()
+        now[0] += 1
+    assert concurrency.limit == 2
+
+
+def test_limit_grows_by_one_after_limit_successes(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: 0.0)
+    concurrency = AdaptiveConcurrency(8)
+    concurrency.on_throttle()
+    assert concurrency.limit == 4
+
+    for _ in range(3):
+        concurrency.on_success()
+    assert concurrency.limit == 4
+    concurrency.on_success()
+    assert concurrency.limit == 5
+
+    for _ in range(100):
+        concurrency.on_success()
+    assert concurrency.limit == 8
@@ -0,0 +1,29 @@
+from RestPlaywright.utils.spec_encoding import condense
+
+
+def test_condense_drops_docs_and_shortens_schemas():
+    schema = {"type": "object", "description": "A pet", "x-internal": True,
+              "properties": {"description": {"type": "string", "description": "Free text"}}}
+
+    assert condense({"schema": schema}) == {"schema": {"type": "object", "properties": {"description": "string"}}}
+
+
+def test_condense_keeps_example_payloads_verbatim():
+    payload = {"description": "a pet", "x-id": 7}
+    media_type = {
+        "schema": {"type": "object", "examples": [payload]},
+        "example": payload,
+        "examples": {
+            "cat": {"summary": "A cat", "description": "Dropped", "x-note": "Dropped", "value": payload},
+            "dog": {"$ref": "#/components/examples/dog"},
+        },
+    }
+
+    condensed = condense({"content": {"application/json": media_type}})["content"]["application/json"]
+
+    assert condensed["schema"]["examples"] == [payload]
+    assert condensed["example"] == payload
+    assert condensed["examples"] == {
+        "cat": {"summary": "A cat", "value": payload},
+        "dog": {"$ref": "#/components/examples/dog"},
+    }
@@ -0,0 +1,137 @@
+import json
+
+import jsonref
+from RestPlaywright.utils.spec_resolver import SpecResolver
+
+
+def schema_ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def json_response(schema):
+    return {"200": {"description": "ok", "content": {"application/json": {"schema": schema}}}}
+
+
+ACYCLIC_SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {
+        "/pets/{id}": {
+            "parameters": [{"$ref": "#/components/parameters/Id"}],
+            "get": {"responses": json_response(schema_ref("Pet"))},
+        },
+        "/pets": {"get": {"responses": json_response({"type": "array", "items": schema_ref("Pet")})}},
+    },
+    "components": {
+        "parameters": {"Id": {"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}},
+        "schemas": {
+            "Pet": {"type": "object", "properties": {
+                "id": {"type": "integer"},
+                "category": schema_ref("Category"),
+                "tags": {"type": "array", "items": schema_ref("Tag")},
+            }},
+            "Category": {"type": "object", "properties": {"name": {"type": "string"}, "tag": schema_ref("Tag")}},
+            "Tag": {"type": "object", "properties": {"label": {"type": "string"}}},
+        },
+    },
+}
+
+
+def spec_with_schemas(**schemas):
+    return {"openapi": "3.0.0", "paths": {}, "components": {"schemas": schemas}}
+
+
+def depth_of(schema, key):
+    """Number of times ``key`` can be followed before reaching a back-reference."""
+    depth = 0
+    while "$ref" not in schema:
+        schema = schema["properties"][key]
+        depth += 1
+    return depth
+
+
+def test_acyclic_spec_resolves_like_jsonref():
+    expected = jsonref.replace_refs(ACYCLIC_SPEC, proxies=False, lazy_load=False)
+
+    resolved = SpecResolver(ACYCLIC_SPEC).resolve(ACYCLIC_SPEC)
+
+    assert json.dumps(resolved, sort_keys=True) == json.dumps(expected, sort_keys=True)
+
+
+def test_resolve_does_not_modify_the_spec():
+    before = json.dumps(ACYCLIC_SPEC, sort_keys=True)
+
+    SpecResolver(ACYCLIC_SPEC).resolve(ACYCLIC_SPEC)
+
+    assert json.dumps(ACYCLIC_SPEC, sort_keys=True) == before
+
+
+def test_self_recursive_schema_leaves_a_back_reference():
+    spec = spec_with_schemas(Category={"type": "object", "properties": {
+        "name": {"type": "string"}, "parent": schema_ref("Category")}})
+
+    resolved = SpecResolver(spec).resolve(schema_ref("Category"))
+
+    assert resolved["properties"]["name"] == {"type": "string"}
+    assert resolved["properties"]["parent"] == schema_ref("Category")
+
+
+def test_max_recursion_expands_a_cycle_more_than_once():
+    spec = spec_with_schemas(Category={"type": "object", "properties": {"parent": schema_ref("Category")}})
+
+    resolved = SpecResolver(spec, max_recursion=3).resolve(schema_ref("Category"))
+
+    assert depth_of(resolved, "parent") == 3
+
+
+def test_mutually_recursive_schemas_terminate():
+    spec = spec_with_schemas(
+        Node={"type": "object", "properties": {"edges": {"type": "array", "items": schema_ref("Edge")}}},
+        Edge={"type": "object", "properties": {"target": schema_ref("Node")}},
+    )
+    resolver = SpecResolver(spec)
+
+    node = resolver.resolve(schema_ref("Node"))
+    edge = resolver.resolve(schema_ref("Edge"))
+
+    assert node["properties"]["edges"]["items"]["properties"]["target"] == schema_ref("Node")
+    assert edge["properties"]["target"]["properties"]["edges"]["items"] == schema_ref("Edge")
+
+
+def test_recursive_result_does_not_depend_on_resolution_order():
+    spec = spec_with_schemas(
+        Node={"type": "object", "properties": {"edge": schema_ref("Edge")}},
+        Edge={"type": "object", "properties": {"target": schema_ref("Node")}},
+    )
+    first = SpecResolver(spec)
+    first.resolve(schema_ref("Edge"))
+
+    assert first.resolve(schema_ref("Node")) == SpecResolver(spec).resolve(schema_ref("Node"))
+
+
+def test_depth_cutoff_leaves_a_back_reference():
+    schemas = {f"Level{i}": {"type": "object", "properties": {"next": schema_ref(f"Level{i + 1}")}}
+               for i in range(5)}
+    schemas["Level5"] = {"type": "string"}
+    spec = spec_with_schemas(**schemas)
+
+    resolved = SpecResolver(spec, max_depth=3).resolve(schema_ref("Level0"))
+
+    assert depth_of(resolved, "next") == 3
+    assert resolved["properties"]["next"]["properties"]["next"]["properties"]["next"] == schema_ref("Level3")
+
+
+def test_depth_cutoff_is_independent_of_the_memo():
+    schemas = {f"Level{i}": {"type": "object", "properties": {"next": schema_ref(f"Level{i + 1}")}}
+               for i in range(5)}
+    schemas["Level5"] = {"type": "string"}
+    spec = spec_with_schemas(**schemas)
+    resolver = SpecResolver(spec, max_depth=4)
+
+    # Level2 is memoized complete here, then reached two references deep from Level0.
+    level2 = resolver.resolve(schema_ref("Level2"))
+    assert level2["properties"]["next"]["properties"]["next"]["properties"]["next"] == {"type": "string"}
+
+    resolved = resolver.resolve(schema_ref("Level0"))
+    assert depth_of(resolved, "next") == 4
+    assert resolved == SpecResolver(spec, max_depth=4).resolve(schema_ref("Level0"))